@@ -0,0 +1,159 @@
+"""Structured questions from a fillable PDF's AcroForm field tree
+
+USCIS forms are fillable: every answer box is a field with a tooltip label (/TU)
+such as "Part 1. Information About You. 1.a. Family Name (Last Name).", a type
+(/FT), flags (/Ff, e.g. multiline) and a widget rectangle on a page. Reading that
+tree only parses a few dictionaries per field, so it is much cheaper than running
+the text layout of every page, and each field is exactly one question instead of a
+regex guess over flattened text.
+
+The result uses api_v2's sections/questions shape. Files without an AcroForm
+(scanned or flat PDFs) return None and callers fall back to text extraction.
+"""
+import io
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+# Field flag bits (PDF 32000-1, 12.7.3.1 and 12.7.4)
+FLAG_MULTILINE = 1 << 12
+FLAG_RADIO = 1 << 15
+FLAG_PUSHBUTTON = 1 << 16
+
+SECTION_LABEL = re.compile(r"^(Part\s+\d+\.[^.]*)\.")
+SECTION_NAME = re.compile(r"Pt(\d+)")
+
+
+def _field_type(field_type: Optional[str], flags: int) -> Optional[str]:
+    if field_type == "/Tx":
+        return "text"
+    if field_type == "/Btn":
+        if flags & FLAG_PUSHBUTTON:
+            return "pushbutton"
+        return "radio" if flags & FLAG_RADIO else "checkbox"
+    if field_type == "/Ch":
+        return "choice"
+    if field_type == "/Sig":
+        return "signature"
+    return None
+
+
+def _walk(reference, parent_name: str, inherited: Dict[str, Any], page_of: Dict[int, int], fields: List[Dict[str, Any]]):
+    field = reference.get_object()
+    partial = field.get("/T")
+    name = f"{parent_name}.{partial}" if parent_name and partial else (partial or parent_name)
+    field_type = field.get("/FT", inherited.get("/FT"))
+    flags = int(field.get("/Ff", inherited.get("/Ff", 0)))
+
+    # Kids carrying /T are child fields; kids without it are this field's widgets
+    widgets = [reference]
+    kids = field.get("/Kids")
+    if kids is not None:
+        widgets = []
+        for kid in kids:
+            if "/T" in kid.get_object():
+                _walk(kid, name, {"/FT": field_type, "/Ff": flags}, page_of, fields)
+            else:
+                widgets.append(kid)
+    if not widgets or field_type is None:
+        return
+
+    widget = widgets[0].get_object()
+    page = page_of.get(getattr(widgets[0], "idnum", None))
+    rect = widget.get("/Rect")
+    fields.append({
+        "name": str(name),
+        "label": str(field.get("/TU", "")).strip(),
+        "type": _field_type(field_type, flags),
+        "multiline": field_type == "/Tx" and bool(flags & FLAG_MULTILINE),
+        "page": page,
+        "rect": [round(float(value), 1) for value in rect] if rect is not None else None
+    })
+
+
+def read_fields(reader) -> Optional[List[Dict[str, Any]]]:
+    """Terminal fields of the AcroForm, or None when the PDF has none"""
+    acroform = reader.trailer["/Root"].get("/AcroForm")
+    if acroform is None:
+        return None
+    top_level = acroform.get_object().get("/Fields")
+    if not top_level:
+        return None
+
+    # Widget object number -> page index, from each page's annotation list
+    page_of: Dict[int, int] = {}
+    for index, page in enumerate(reader.pages):
+        for annotation in page.get("/Annots") or []:
+            if hasattr(annotation, "idnum"):
+                page_of[annotation.idnum] = index
+
+    fields: List[Dict[str, Any]] = []
+    for reference in top_level.get_object():
+        _walk(reference, "", {}, page_of, fields)
+    return fields
+
+
+def _section_and_question(field: Dict[str, Any]) -> Tuple[str, str]:
+    """Split "Part 1. Information About You. 1.a. Family Name." into section and question"""
+    match = SECTION_LABEL.match(field["label"])
+    if match:
+        return match.group(1), field["label"][match.end():].strip() or field["label"]
+    match = SECTION_NAME.search(field["name"])
+    if match:
+        return f"Part {match.group(1)}", field["label"]
+    return (f"Page {field['page'] + 1}" if field["page"] is not None else "Other"), field["label"]
+
+
+def fields_to_sections(fields: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Group answerable, labelled fields into api_v2-style sections in reading order"""
+    answerable = [field for field in fields if field["label"] and field["type"] not in ("pushbutton", None)]
+    answerable.sort(key=lambda field: (
+        field["page"] if field["page"] is not None else 1 << 30,
+        -(field["rect"][3] if field["rect"] else 0),
+        field["rect"][0] if field["rect"] else 0
+    ))
+
+    sections: Dict[str, List[Dict[str, Any]]] = {}
+    for field in answerable:
+        title, question = _section_and_question(field)
+        sections.setdefault(title, []).append({
+            "id": field["name"],
+            "originalQuestion": question,
+            "type": "long" if field["multiline"] else "short",
+            "fieldType": field["type"],
+            "page": field["page"],
+            "rect": field["rect"]
+        })
+    return [{"sectionTitle": title, "questions": questions} for title, questions in sections.items()]
+
+
+def sections_to_chunks(sections: List[Dict[str, Any]]) -> Dict[str, List[str]]:
+    """The chunk_document shape: long (multiline) and short questions"""
+    questions = [question for section in sections for question in section["questions"]]
+    return {
+        "long_essay_questions": [question["originalQuestion"] for question in questions if question["type"] == "long"],
+        "short_answer_questions": [question["originalQuestion"] for question in questions if question["type"] == "short"]
+    }
+
+
+def extract_acroform(content: bytes) -> Optional[Dict[str, Any]]:
+    """Sections, title, page count and first page text from the field tree; None for non-fillable PDFs"""
+    import PyPDF2
+
+    reader = PyPDF2.PdfReader(io.BytesIO(content))
+    fields = read_fields(reader)
+    if not fields:
+        return None
+    sections = fields_to_sections(fields)
+    if not sections:
+        return None
+
+    metadata = reader.metadata
+    return {
+        "title": str(metadata.title or "") if metadata is not None else "",
+        "subject": str(metadata.subject or "") if metadata is not None else "",
+        # Field labels rarely name the form ("Part 1. ..."); the first page's heading does
+        "first_page_text": reader.pages[0].extract_text() or "",
+        "pages": len(reader.pages),
+        "fields": len(fields),
+        "sections": sections
+    }
@@ -1,17 +1,81 @@
-from fastapi import FastAPI, File, UploadFile, HTTPException
+from fastapi import FastAPI, File, Form, UploadFile, HTTPException, Header
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
-import uvicorn
 import json
 import os
-import requests
-from typing import List, Dict, Any
-import PyPDF2
+from typing import List, Dict, Any, Optional, Tuple
 import io
 import re
+import threading
+import time
+import asyncio
+from contextlib import asynccontextmanager
 from datetime import datetime
+from fastapi.responses import Response, PlainTextResponse, StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from llm_router import OllamaRouter, load_backend_urls
+from metrics import REGISTRY, CONTENT_TYPE as METRICS_CONTENT_TYPE
+from tracing import instrument_app, span
+import profiler
+import hashlib
+import uuid
+from cache import CACHE_LOOKUPS, create_cache
+from functools import lru_cache
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from chunking import CHARS_PER_TOKEN, reassemble, split_for_translation
+from acroform import extract_acroform, sections_to_chunks
+from translation_packs import TranslationPacks
+from projection import page_bounds, paginate, parse_list, project, serialize
+from ratelimit import limit_app, settle
+from sessions import SESSION_MAX_ENTRIES, SESSION_TTL, SessionStore, cap_context, history_messages, history_tokens
+from resolver import (
+    TIER_CACHE, TIER_FAILED, TIER_LLM, TIER_PACK, TIER_REUSED, TIER_STRUCTURED,
+    build_structured_index, normalize_text, question_fingerprint, record_resolution
+)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Warm the configured models in the background and keep them pinned while serving"""
+    tasks = []
+    if OLLAMA_WARMUP:
+        tasks.append(asyncio.create_task(run_in_threadpool(warm_models, OLLAMA_WARM_MODELS, "startup")))
+    else:
+        warmup_state["completed"] = True
+    if OLLAMA_KEEPALIVE_INTERVAL > 0:
+        tasks.append(asyncio.create_task(keep_models_alive()))
+    
+    yield
+    
+    for task in tasks:
+        task.cancel()
+
+app = FastAPI(title="NavigateHome.AI API", version="1.0.0", lifespan=lifespan)
+
+# Questions an analysis is expected to send to the model: the long essay ones plus 10 short ones
+ANALYZE_ESTIMATED_QUESTIONS = 15
+
+def estimated_translation_chunks(request) -> int:
+    """Chunks /translate-document will translate, estimated from the body size"""
+    try:
+        length = int(request.headers.get("content-length") or 0)
+    except ValueError:
+        length = 0
+    return 1 + length // (TRANSLATE_CHUNK_TOKENS * CHARS_PER_TOKEN)
 
-app = FastAPI(title="NavigateHome.AI API", version="1.0.0")
+# Per-client rate limits on the LLM-backed endpoints, in estimated Ollama generations per
+# request (see ratelimit.py). Added before CORS so 429 responses still carry CORS headers
+RATE_LIMIT_COSTS = {
+    # A simplification and a translation per question; settled once the tiers are known
+    "/analyze-document": lambda request: 2 * ANALYZE_ESTIMATED_QUESTIONS,
+    # The answer and its translation
+    "/ask-question": lambda request: 2,
+    # Settled to the chunks that reached the model; the estimate only decides admission
+    "/translate-document": estimated_translation_chunks,
+    # One analysis up front; the batch is settled per document and stops once the bucket is in debt
+    "/batch-analyze": lambda request: 2 * ANALYZE_ESTIMATED_QUESTIONS
+}
+rate_limiter = limit_app(app, RATE_LIMIT_COSTS)
 
 # CORS middleware
 app.add_middleware(
@@ -20,11 +84,227 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing", "Retry-After"],
 )
 
+# Admin-only endpoints (profiling) are disabled unless ADMIN_TOKEN is set
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+PROFILE_MAX_SECONDS = float(os.getenv("PROFILE_MAX_SECONDS", "60"))
+
+# Request latency metrics and per-stage Server-Timing header
+instrument_app(app, admin_token=ADMIN_TOKEN)
+
 # Ollama API configuration
-OLLAMA_BASE_URL = "http://localhost:11434"
-OLLAMA_MODEL = "llama3.1"  # or "mistral", "codellama", etc.
+# OLLAMA_BASE_URLS takes a comma separated list of nodes to load balance across
+OLLAMA_BASE_URLS = load_backend_urls()
+OLLAMA_BASE_URL = OLLAMA_BASE_URLS[0]
+OLLAMA_MODEL = os.getenv("OLLAMA_MODEL", "llama3.1")  # or "mistral", "codellama", etc.
+OLLAMA_TIMEOUT = float(os.getenv("OLLAMA_TIMEOUT", "30"))
+
+ollama_router = OllamaRouter(
+    OLLAMA_BASE_URLS,
+    timeout=OLLAMA_TIMEOUT,
+    failure_threshold=int(os.getenv("OLLAMA_BREAKER_FAILURES", "3")),
+    reset_timeout=float(os.getenv("OLLAMA_BREAKER_RESET_SECONDS", "30"))
+)
+
+# Concurrent requests each Ollama node serves (match the server's OLLAMA_NUM_PARALLEL)
+OLLAMA_NUM_PARALLEL = int(os.getenv("OLLAMA_NUM_PARALLEL", "4"))
+
+# Per-endpoint generation profiles: small fast model and tight budgets for simplification,
+# larger model for chat. num_ctx is what a profile needs; requests send the largest one
+# among the profiles on the same model (see model_context_lengths). Override any profile field with a JSON file in OLLAMA_PROFILES_FILE,
+# e.g. {"simplify": {"model": "llama3.2:1b", "num_predict": 64}}
+GENERATION_PROFILES = {
+    "default": {
+        "model": OLLAMA_MODEL
+    },
+    "simplify": {
+        "model": os.getenv("OLLAMA_SIMPLIFY_MODEL", OLLAMA_MODEL),
+        "num_predict": 96,
+        "num_ctx": 1024,
+        "temperature": 0.2,
+        "stop": ["\n\n"]
+    },
+    "translate": {
+        "model": os.getenv("OLLAMA_TRANSLATE_MODEL", OLLAMA_MODEL),
+        "num_predict": 256,
+        "num_ctx": 2048,
+        "temperature": 0.1
+    },
+    "chat": {
+        "model": os.getenv("OLLAMA_CHAT_MODEL", OLLAMA_MODEL),
+        "num_predict": 512,
+        "num_ctx": 4096,
+        "temperature": 0.6
+    },
+    # Rolling chat-session summaries; num_predict caps the summary, and with it the prompt
+    "summarize": {
+        "model": os.getenv("OLLAMA_SUMMARIZE_MODEL", OLLAMA_MODEL),
+        "num_predict": 200,
+        "num_ctx": 4096,
+        "temperature": 0.2
+    }
+}
+
+def load_generation_profiles(path: str = os.getenv("OLLAMA_PROFILES_FILE", "")) -> Dict[str, Dict[str, Any]]:
+    """Merge profile overrides from a JSON file over the built-in profiles"""
+    profiles = {name: dict(profile) for name, profile in GENERATION_PROFILES.items()}
+    if not path:
+        return profiles
+    try:
+        with open(path, encoding="utf-8") as f:
+            overrides = json.load(f)
+        for name, fields in overrides.items():
+            profiles.setdefault(name, {"model": OLLAMA_MODEL}).update(fields)
+    except Exception as e:
+        print(f"Error loading generation profiles from {path}: {e}")
+    return profiles
+
+GENERATION_PROFILES = load_generation_profiles()
+
+def model_context_lengths(profiles: Dict[str, Dict[str, Any]]) -> Dict[str, int]:
+    """One num_ctx per model: the largest any profile on that model asks for
+
+    Ollama reloads the runner whenever a request's num_ctx differs from the loaded
+    one, so profiles sharing a model (simplify -> translate, chat -> translate) must
+    agree on it or every switch pays a full reload and loses the KV prefix cache.
+    """
+    lengths: Dict[str, int] = {}
+    for profile in profiles.values():
+        if "num_ctx" in profile:
+            model = profile.get("model", OLLAMA_MODEL)
+            lengths[model] = max(lengths.get(model, 0), int(profile["num_ctx"]))
+    return lengths
+
+MODEL_NUM_CTX = model_context_lengths(GENERATION_PROFILES)
+
+def profile_settings(profile: str, model: str = None, options: Dict[str, Any] = None):
+    """Resolve a generation profile into (model, Ollama options)"""
+    settings = dict(GENERATION_PROFILES.get(profile, GENERATION_PROFILES["default"]))
+    profile_model = settings.pop("model", OLLAMA_MODEL)
+    model = model or profile_model
+    settings.pop("num_ctx", None)
+    if model in MODEL_NUM_CTX:
+        settings["num_ctx"] = MODEL_NUM_CTX[model]
+    # Explicit options win, num_ctx included, even though a different one forces a reload
+    settings.update(options or {})
+    return model, settings
+
+def build_generate_payload(prompt: str, profile: str = "default", model: str = None, options: Dict[str, Any] = None) -> Dict[str, Any]:
+    """Build an /api/generate request body from a generation profile"""
+    model, settings = profile_settings(profile, model, options)
+    payload = {
+        "model": model,
+        "prompt": prompt,
+        "stream": False,
+        "keep_alive": OLLAMA_KEEP_ALIVE
+    }
+    if settings:
+        payload["options"] = settings
+    return payload
+
+def build_chat_payload(system: str, user: str, profile: str = "default", model: str = None, options: Dict[str, Any] = None,
+                       history: List[Dict[str, str]] = None) -> Dict[str, Any]:
+    """Build an /api/chat request body: a fixed system prefix, any earlier turns, then the per-call message"""
+    model, settings = profile_settings(profile, model, options)
+    payload = {
+        "model": model,
+        "messages": [
+            {"role": "system", "content": system},
+            *(history or []),
+            {"role": "user", "content": user}
+        ],
+        "stream": False,
+        "keep_alive": OLLAMA_KEEP_ALIVE
+    }
+    if settings:
+        payload["options"] = settings
+    return payload
+
+# Model warm-up and keep-alive
+def parse_keep_alive(value: str):
+    """OLLAMA_KEEP_ALIVE as Ollama expects it
+
+    Strings are parsed as Go durations ("30m", "1h", "-1m"), which need a unit, so a
+    bare integer is sent as a number of seconds instead; -1 pins the model forever.
+    """
+    value = value.strip()
+    return int(value) if re.fullmatch(r"-?\d+", value) else value
+
+OLLAMA_KEEP_ALIVE = parse_keep_alive(os.getenv("OLLAMA_KEEP_ALIVE", "30m"))
+OLLAMA_WARMUP = os.getenv("OLLAMA_WARMUP", "1") == "1"
+OLLAMA_WARM_MODELS = [
+    m.strip() for m in os.getenv(
+        "OLLAMA_WARM_MODELS",
+        ",".join(dict.fromkeys(profile["model"] for profile in GENERATION_PROFILES.values()))
+    ).split(",") if m.strip()
+]
+OLLAMA_WARMUP_TIMEOUT = float(os.getenv("OLLAMA_WARMUP_TIMEOUT", "120"))
+OLLAMA_KEEPALIVE_INTERVAL = float(os.getenv("OLLAMA_KEEPALIVE_INTERVAL", "240"))  # 0 disables
+
+MODEL_LOAD_SECONDS = REGISTRY.histogram(
+    "ollama_model_load_seconds",
+    "Model load time reported by Ollama (load_duration); large values are cold starts",
+    buckets=(0.05, 0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+)
+MODEL_WARMUP_SECONDS = REGISTRY.gauge(
+    "ollama_model_warmup_seconds",
+    "Wall time of the most recent warm-up or keep-alive ping per model and backend"
+)
+MODEL_WARMUP_FAILURES = REGISTRY.counter(
+    "ollama_model_warmup_failures_total",
+    "Warm-up or keep-alive pings that failed"
+)
+
+warmup_state = {"completed": False, "models": {}}
+
+# Result caches; CACHE_BACKEND=sqlite shares them across worker processes (see serve.py)
+LLM_CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", str(7 * 24 * 3600)))
+UPLOAD_CACHE_TTL = float(os.getenv("UPLOAD_CACHE_TTL", str(24 * 3600)))
+# Only deterministic-enough profiles are cached; chat answers stay fresh
+LLM_CACHEABLE_PROFILES = {"simplify", "translate"}
+llm_cache = create_cache("llm", ttl=LLM_CACHE_TTL)
+upload_cache = create_cache("upload", ttl=UPLOAD_CACHE_TTL)
+# Finished analyses, so a re-analysis only processes questions that changed
+ANALYSIS_CACHE_TTL = float(os.getenv("ANALYSIS_CACHE_TTL", str(24 * 3600)))
+analysis_cache = create_cache("analysis", ttl=ANALYSIS_CACHE_TTL)
+# Chat sessions for /ask-question (see sessions.py)
+session_store = SessionStore(create_cache("sessions", ttl=SESSION_TTL, max_entries=SESSION_MAX_ENTRIES))
+
+# Pipeline metrics
+OLLAMA_REQUEST_SECONDS = REGISTRY.histogram(
+    "ollama_request_duration_seconds",
+    "Ollama call latency by model and API path, including retries"
+)
+OLLAMA_TOKENS_PER_SECOND = REGISTRY.histogram(
+    "ollama_tokens_per_second",
+    "Decode throughput reported by Ollama (eval_count / eval_duration)",
+    buckets=(1, 2, 5, 10, 20, 40, 80, 160, 320)
+)
+OLLAMA_TOKENS = REGISTRY.counter(
+    "ollama_tokens_total",
+    "Prompt (prefill) and output tokens processed by Ollama"
+)
+OLLAMA_FAILURES = REGISTRY.counter(
+    "ollama_failures_total",
+    "Ollama calls that failed on every backend"
+)
+OLLAMA_IN_FLIGHT = REGISTRY.gauge(
+    "ollama_in_flight_requests",
+    "Ollama calls currently outstanding (queue depth) per backend"
+)
+OLLAMA_BACKEND_UP = REGISTRY.gauge(
+    "ollama_backend_up",
+    "1 while a backend's circuit breaker is not open"
+)
+PDF_EXTRACT_SECONDS_PER_PAGE = REGISTRY.histogram(
+    "pdf_extract_seconds_per_page",
+    "PDF extraction time divided by page count, by mode (acroform/text)",
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+)
+# auto: read the fillable field tree when there is one, page text otherwise; text: always page text
+PDF_EXTRACTION_MODE = os.getenv("PDF_EXTRACTION_MODE", "auto")
 
 # USCIS Forms database
 USCIS_FORMS = {
@@ -205,40 +485,154 @@ TRANSLATIONS = {
     }
 }
 
-def call_ollama(prompt: str, model: str = OLLAMA_MODEL) -> str:
-    """Call Ollama API to process text"""
+@lru_cache(maxsize=None)
+def get_structured_index():
+    """Precomputed answers from the v2 forms data and the LEQ dataset, built on first use"""
+    from api_v2 import get_navigatehome_ai
+    
+    navigatehome_ai = get_navigatehome_ai()
+    return build_structured_index(navigatehome_ai.forms_data, navigatehome_ai.translations, LEQ_DATASET, TRANSLATIONS)
+
+# Offline translation packs (translation_packs.py build), loaded per language on first request
+translation_packs = TranslationPacks()
+
+def llm_cache_key(path: str, payload: Dict[str, Any]) -> str:
+    """Hash everything that affects the output (model, prompt/messages, options)"""
+    material = {key: value for key, value in payload.items() if key not in ("keep_alive", "stream")}
+    return hashlib.sha256(f"{path}:{json.dumps(material, sort_keys=True)}".encode()).hexdigest()
+
+def call_ollama(prompt: str, model: str = None, profile: str = "default", options: Dict[str, Any] = None, system: str = None,
+                history: List[Dict[str, str]] = None) -> str:
+    """Call Ollama API to process text
+
+    With a system prompt the call goes through /api/chat so the system prefix is
+    identical across calls and Ollama can reuse its KV cache instead of re-running prefill.
+    """
+    return call_ollama_tiered(prompt, model, profile, options, system, history)[0]
+
+def call_ollama_tiered(prompt: str, model: str = None, profile: str = "default", options: Dict[str, Any] = None, system: str = None,
+                       history: List[Dict[str, str]] = None) -> Tuple[str, str]:
+    """call_ollama that also reports whether the answer came from the cache, the model, or failed"""
     try:
-        url = f"{OLLAMA_BASE_URL}/api/generate"
-        data = {
-            "model": model,
-            "prompt": prompt,
-            "stream": False
-        }
+        if system is not None:
+            path, data = "/api/chat", build_chat_payload(system, prompt, profile, model, options, history)
+        else:
+            path, data = "/api/generate", build_generate_payload(prompt, profile, model, options)
+        model = data["model"]
+        
+        cache_key = None
+        if profile in LLM_CACHEABLE_PROFILES:
+            cache_key = llm_cache_key(path, data)
+            cached = llm_cache.get(cache_key)
+            if cached is not None:
+                return cached, TIER_CACHE
         
-        response = requests.post(url, json=data, timeout=30)
-        response.raise_for_status()
+        started = time.perf_counter()
+        try:
+            result = ollama_router.post(path, data)
+        except Exception:
+            OLLAMA_FAILURES.inc(model=model, path=path)
+            raise
+        OLLAMA_REQUEST_SECONDS.observe(time.perf_counter() - started, model=model, path=path)
         
-        result = response.json()
-        return result.get("response", "")
+        if "load_duration" in result:
+            MODEL_LOAD_SECONDS.observe(result["load_duration"] / 1e9, model=model)
+        if result.get("eval_duration"):
+            OLLAMA_TOKENS_PER_SECOND.observe(result.get("eval_count", 0) / (result["eval_duration"] / 1e9), model=model)
+        OLLAMA_TOKENS.inc(result.get("prompt_eval_count", 0), model=model, kind="prompt")
+        OLLAMA_TOKENS.inc(result.get("eval_count", 0), model=model, kind="output")
+        
+        if "message" in result:
+            text = result["message"].get("content", "")
+        else:
+            text = result.get("response", "")
+        if cache_key is not None and text:
+            llm_cache.set(cache_key, text)
+        return text, TIER_LLM
     except Exception as e:
         print(f"Error calling Ollama: {e}")
-        return "I'm sorry, I'm having trouble processing your request right now. Please try again."
+        return "I'm sorry, I'm having trouble processing your request right now. Please try again.", TIER_FAILED
+
+def warm_models(models: List[str], reason: str = "startup") -> Dict[str, Any]:
+    """Load each model on every backend with an empty prompt and pin it for OLLAMA_KEEP_ALIVE"""
+    for model in models:
+        payload = {"model": model, "keep_alive": OLLAMA_KEEP_ALIVE}
+        # Load with the context real requests use, or the first one reloads the model
+        if model in MODEL_NUM_CTX:
+            payload["options"] = {"num_ctx": MODEL_NUM_CTX[model]}
+        results = ollama_router.broadcast("/api/generate", payload, timeout=OLLAMA_WARMUP_TIMEOUT)
+        
+        backends = {}
+        for result in results:
+            if result["ok"]:
+                load_seconds = result["data"].get("load_duration", 0) / 1e9
+                MODEL_LOAD_SECONDS.observe(load_seconds, model=model)
+                MODEL_WARMUP_SECONDS.set(result["latency_ms"] / 1000, model=model, backend=result["url"], reason=reason)
+                backends[result["url"]] = {"ok": True, "load_seconds": round(load_seconds, 3), "latency_ms": result["latency_ms"]}
+            else:
+                MODEL_WARMUP_FAILURES.inc(model=model, backend=result["url"], reason=reason)
+                print(f"Error warming {model} on {result['url']}: {result['error']}")
+                backends[result["url"]] = {"ok": False, "error": result["error"]}
+        
+        warmup_state["models"][model] = {"reason": reason, "at": datetime.now().isoformat(), "backends": backends}
+    
+    warmup_state["completed"] = True
+    return warmup_state
+
+async def keep_models_alive():
+    """Periodically re-pin the warm models so Ollama never unloads them while we serve traffic"""
+    while True:
+        await asyncio.sleep(OLLAMA_KEEPALIVE_INTERVAL)
+        try:
+            await run_in_threadpool(warm_models, OLLAMA_WARM_MODELS, "keep_alive")
+        except Exception as e:
+            print(f"Error in model keep-alive: {e}")
+
+def preload():
+    """Import the lazily loaded dependencies ahead of time (serve.py calls this before forking)"""
+    import PyPDF2  # noqa: F401
+    import requests  # noqa: F401
+    
+    get_structured_index()
+    # The full dataset is the most requested response
+    leq_dataset_full()
 
 def extract_text_from_pdf(file_content: bytes) -> str:
     """Extract text from PDF file"""
     try:
-        pdf_file = io.BytesIO(file_content)
-        pdf_reader = PyPDF2.PdfReader(pdf_file)
-        
-        text = ""
-        for page in pdf_reader.pages:
-            text += page.extract_text() + "\n"
+        with span("extract"):
+            import PyPDF2  # deferred: only PDF endpoints pay for it
+            
+            started = time.perf_counter()
+            pdf_file = io.BytesIO(file_content)
+            pdf_reader = PyPDF2.PdfReader(pdf_file)
+            
+            text = ""
+            for page in pdf_reader.pages:
+                text += page.extract_text() + "\n"
+            
+            if pdf_reader.pages:
+                PDF_EXTRACT_SECONDS_PER_PAGE.observe((time.perf_counter() - started) / len(pdf_reader.pages), mode="text")
         
         return text
     except Exception as e:
         print(f"Error extracting PDF text: {e}")
         return ""
 
+def extract_form_fields(content: bytes) -> Optional[Dict[str, Any]]:
+    """Questions from the PDF's AcroForm fields, or None for flat and scanned files"""
+    try:
+        with span("extract"):
+            started = time.perf_counter()
+            form = extract_acroform(content)
+            if form is not None and form["pages"]:
+                PDF_EXTRACT_SECONDS_PER_PAGE.observe((time.perf_counter() - started) / form["pages"], mode="acroform")
+        return form
+    except Exception as e:
+        print(f"Error reading PDF form fields: {e}")
+        return None
+
+@span("identify")
 def identify_form_type(text: str) -> str:
     """Identify the USCIS form type from text"""
     text_upper = text.upper()
@@ -249,6 +643,7 @@ def identify_form_type(text: str) -> str:
     
     return "Unknown"
 
+@span("chunk")
 def chunk_document(text: str) -> Dict[str, List[str]]:
     """Chunk document into LEQs and short answer questions"""
     leqs = []
@@ -284,54 +679,242 @@ def chunk_document(text: str) -> Dict[str, List[str]]:
         "short_answer_questions": short_questions
     }
 
+LANGUAGE_NAMES = {
+    "es": "Spanish",
+    "zh": "Chinese", 
+    "ar": "Arabic",
+    "hi": "Hindi",
+    "pt": "Portuguese",
+    "ru": "Russian",
+    "fr": "French",
+    "vi": "Vietnamese",
+    "ko": "Korean"
+}
+
+# Prompt templates are split into a stable system prefix and a short per-call message.
+# Everything that does not change between calls lives in the prefix so the backend
+# only has to prefill the question itself.
+SIMPLIFY_SYSTEM_PROMPT = """You are an immigration expert helping non-native English speakers understand complex legal questions.
+
+Simplify the immigration form question you are given into plain, simple English that anyone can understand.
+
+Requirements:
+- Use simple words and short sentences
+- Avoid legal jargon
+- Make it conversational and friendly
+- Keep the same meaning but make it much easier to understand
+- Maximum 2 sentences
+
+Reply with only the simplified version."""
+
+TRANSLATE_SYSTEM_PROMPT = """Translate the text you are given from English to {language}.
+Keep the meaning and tone exactly the same.
+Make sure it's natural and easy to understand in {language}.
+
+Reply with only the translation."""
+
+CHAT_SYSTEM_PROMPT = """You are NavigateHome.AI, a personal AI caseworker for immigrants. You help people navigate the complex US immigration system.
+
+Provide a helpful, accurate, and empathetic response. Include:
+- Clear, simple explanations
+- Step-by-step guidance when appropriate
+- Relevant resources or next steps
+- Encouragement and support
+
+Keep your response conversational and easy to understand."""
+
+SUMMARIZE_SYSTEM_PROMPT = """You keep notes on a conversation between an immigrant and their AI caseworker.
+
+You are given the notes so far and the next part of the conversation. Write updated notes that keep:
+- the person's situation, forms and deadlines they mentioned
+- questions already answered and the key points of each answer
+- anything they still need to do
+
+Be brief: at most 150 words. Reply with only the updated notes."""
+
+def translate_system_prompt(target_language: str) -> str:
+    """System prefix for translations into one language (stable per language)"""
+    return TRANSLATE_SYSTEM_PROMPT.format(language=LANGUAGE_NAMES.get(target_language, target_language))
+
+@span("simplify")
+def simplify_with_ollama(question: str) -> Tuple[str, str]:
+    """Simplify through the LLM tier (cache, then model); returns (text, tier)"""
+    return call_ollama_tiered(question, profile="simplify", system=SIMPLIFY_SYSTEM_PROMPT)
+
+@span("translate")
+def translate_with_ollama(text: str, target_language: str) -> Tuple[str, str]:
+    """Translate through the LLM tier (cache, then model); returns (text, tier)"""
+    # Translations run a little longer than the source, so scale the budget with the input
+    return call_ollama_tiered(text, profile="translate", system=translate_system_prompt(target_language), options={
+        "num_predict": max(GENERATION_PROFILES["translate"].get("num_predict", 256), len(text) // 2)
+    })
+
+def resolve_simplification(question: str) -> Tuple[str, str]:
+    """Simplified question from precomputed data when known, otherwise from the LLM tier"""
+    text, tier = get_structured_index().simplified(question), TIER_STRUCTURED
+    if text is None:
+        text, tier = simplify_with_ollama(question)
+    record_resolution("simplify", tier)
+    return text, tier
+
+def resolve_translation(text: str, target_language: str) -> Tuple[str, str]:
+    """Translation from precomputed data or an offline pack when known, otherwise from the LLM tier"""
+    translated, tier = get_structured_index().translation(text, target_language), TIER_STRUCTURED
+    if translated is None:
+        translated, tier = translation_packs.translation(text, target_language), TIER_PACK
+    if translated is None:
+        translated, tier = translate_with_ollama(text, target_language)
+    record_resolution("translate", tier)
+    return translated, tier
+
 def simplify_question_with_ollama(question: str) -> str:
     """Use Ollama to simplify complex immigration questions"""
-    prompt = f"""
-    You are an immigration expert helping non-native English speakers understand complex legal questions.
-    
-    Simplify this immigration form question into plain, simple English that anyone can understand:
-    
-    "{question}"
-    
-    Requirements:
-    - Use simple words and short sentences
-    - Avoid legal jargon
-    - Make it conversational and friendly
-    - Keep the same meaning but make it much easier to understand
-    - Maximum 2 sentences
-    
-    Simplified version:
-    """
-    
-    return call_ollama(prompt)
+    return resolve_simplification(question)[0]
 
 def translate_text_with_ollama(text: str, target_language: str) -> str:
     """Use Ollama to translate text to target language"""
-    language_names = {
-        "es": "Spanish",
-        "zh": "Chinese", 
-        "ar": "Arabic",
-        "hi": "Hindi",
-        "pt": "Portuguese",
-        "ru": "Russian",
-        "fr": "French",
-        "vi": "Vietnamese",
-        "ko": "Korean"
-    }
+    return resolve_translation(text, target_language)[0]
+
+def summarize_conversation(previous_summary: str, turns: List[Dict[str, str]]) -> Optional[str]:
+    """Fold older chat turns into a session's rolling summary; None if the model is unavailable"""
+    transcript = "\n\n".join(f"{turn['role'].capitalize()}: {turn['content']}" for turn in turns)
+    notes = previous_summary or "(none yet)"
+    summary, tier = call_ollama_tiered(f"Notes so far:\n{notes}\n\nConversation:\n{transcript}",
+                                       profile="summarize", system=SUMMARIZE_SYSTEM_PROMPT)
+    return summary.strip() if tier != TIER_FAILED else None
+
+def process_questions(questions: List[str], language: str, previous: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+    """Simplify, then translate, a list of questions
+
+    All simplifications run before any translation so consecutive calls share the same
+    system prefix; interleaving the two templates would evict the cached prefix every call.
+    Each item reports the tier (reused, structured, cache, llm, failed) behind each step.
+
+    With a previous analysis, unchanged questions reuse its simplifications in any
+    language, and its translations when the language is the same.
+    """
+    reused_simplified = {}
+    reused_translated = {}
+    for item in (previous or {}).get("items", []):
+        if item["tiers"]["simplified"] != TIER_FAILED:
+            reused_simplified[normalize_text(item["original"])] = item["simplified"]
+        # A translation of a failed simplification translated the fallback text, so redo both
+        if TIER_FAILED not in (item["tiers"]["simplified"], item["tiers"]["translated"]):
+            reused_translated[item["fingerprint"]] = item["translated"]
     
-    target_lang_name = language_names.get(target_language, target_language)
+    simplified = []
+    for question in questions:
+        text = reused_simplified.get(normalize_text(question))
+        if text is not None:
+            record_resolution("simplify", TIER_REUSED)
+        simplified.append((text, TIER_REUSED) if text is not None else resolve_simplification(question))
     
-    prompt = f"""
-    Translate the following text from English to {target_lang_name}.
-    Keep the meaning and tone exactly the same.
-    Make sure it's natural and easy to understand in {target_lang_name}.
+    translated = simplified
+    if language != "en":
+        translated = []
+        for question, (text, _) in zip(questions, simplified):
+            reused = reused_translated.get(question_fingerprint(question, language))
+            if reused is not None:
+                record_resolution("translate", TIER_REUSED)
+            translated.append((reused, TIER_REUSED) if reused is not None else resolve_translation(text, language))
     
-    Text to translate: "{text}"
+    return [
+        analysis_item(question, language, simplified_result, translated_result)
+        for question, simplified_result, translated_result in zip(questions, simplified, translated)
+    ]
+
+def analysis_item(question: str, language: str, simplified: Tuple[str, str], translated: Tuple[str, str]) -> Dict[str, Any]:
+    """One analyzed question from its (text, tier) simplification and translation"""
+    return {
+        "original": question,
+        "simplified": simplified[0],
+        "translated": translated[0],
+        "language": language,
+        "fingerprint": question_fingerprint(question, language),
+        "tiers": {"simplified": simplified[1], "translated": translated[1]}
+    }
+
+def llm_generations(items: List[Dict[str, Any]], language: str) -> int:
+    """Model calls an analysis actually made; reused, structured, pack and cached answers are free"""
+    steps = ["simplified", "translated"] if language != "en" else ["simplified"]
+    return sum(1 for item in items for step in steps if item["tiers"][step] in (TIER_LLM, TIER_FAILED))
+
+def questions_to_analyze(chunks: Dict[str, List[str]]) -> Tuple[List[str], List[str]]:
+    """The long essay questions plus the first few short ones"""
+    return chunks["long_essay_questions"], chunks["short_answer_questions"][:10]
+
+def structured_form_questions(form_type: str) -> Optional[Dict[str, List[str]]]:
+    """Questions of a form from the precomputed v2 data, split like chunk_document"""
+    from api_v2 import get_navigatehome_ai
     
-    Translation:
+    form = get_navigatehome_ai().forms_data.get(form_type.upper())
+    if form is None:
+        return None
+    questions = [question for section in form["sections"] for question in section["questions"]]
+    return {
+        "long_essay_questions": [question["originalQuestion"] for question in questions if question.get("type") != "short"],
+        "short_answer_questions": [question["originalQuestion"] for question in questions if question.get("type") == "short"]
+    }
+
+# Shared scheduler for fanned-out LLM work (document chunks, batch questions); it is
+# sized to the Ollama slots across all nodes so adding a node or raising
+# OLLAMA_NUM_PARALLEL adds throughput without ever queueing more than the nodes serve
+llm_pool = ThreadPoolExecutor(
+    max_workers=max(1, len(OLLAMA_BASE_URLS) * OLLAMA_NUM_PARALLEL),
+    thread_name_prefix="llm"
+)
+
+# Long documents are translated chunk by chunk on llm_pool
+TRANSLATE_CHUNK_TOKENS = int(os.getenv("TRANSLATE_CHUNK_TOKENS", "400"))
+
+def translate_chunk(text: str, target_language: str) -> Tuple[str, str]:
+    """Translate one chunk, keeping the source text when the LLM tier fails"""
+    if not text.strip():
+        return text, TIER_STRUCTURED
+    translated, tier = resolve_translation(text, target_language)
+    if tier == TIER_FAILED:
+        return text, tier
+    return translated, tier
+
+def translate_chunks(chunks: List[Tuple[str, str]], target_language: str):
+    """Translate chunks concurrently, yielding (index, translated, tier) as each finishes
+
+    Repeated chunks (headers, boilerplate) are translated once and fanned out.
     """
+    positions: Dict[str, List[int]] = {}
+    for index, (text, _) in enumerate(chunks):
+        positions.setdefault(text, []).append(index)
     
-    return call_ollama(prompt)
+    futures = {
+        # copy_context keeps the request trace, so chunk spans show up in Server-Timing
+        llm_pool.submit(contextvars.copy_context().run, translate_chunk, text, target_language): text
+        for text in positions
+    }
+    for future in as_completed(futures):
+        translated, tier = future.result()
+        for index in positions[futures[future]]:
+            yield index, translated, tier
+
+def translation_events(text: str, chunks: List[Tuple[str, str]], target_language: str):
+    """One event per chunk as it completes, then the reassembled document as the last event"""
+    translated = [None] * len(chunks)
+    tiers: Dict[str, int] = {}
+    source_tiers: Dict[str, str] = {}
+    for index, chunk_text, tier in translate_chunks(chunks, target_language):
+        translated[index] = (chunk_text, chunks[index][1])
+        tiers[tier] = tiers.get(tier, 0) + 1
+        source_tiers[chunks[index][0]] = tier
+        yield {"index": index, "total": len(chunks), "translated_text": chunk_text, "tier": tier}
+    # Repeated chunks are translated once, so the rate limit charges each distinct chunk once
+    settle(sum(1 for tier in source_tiers.values() if tier in (TIER_LLM, TIER_FAILED)))
+    yield {
+        "original_text": text,
+        "translated_text": reassemble(translated),
+        "target_language": target_language,
+        "chunks": len(chunks),
+        "tiers": tiers,
+        "status": "success"
+    }
 
 @app.get("/")
 async def root():
@@ -357,6 +940,43 @@ async def get_form_details(form_code: str):
         "long_essay_questions": leqs
     }
 
+def process_pdf(content: bytes) -> Dict[str, Any]:
+    """Extract, identify and chunk a PDF, reusing results for identical uploads
+
+    Fillable forms are read from their field tree; flat or scanned files fall back to page text.
+    """
+    digest = hashlib.sha256(content).hexdigest()
+    cached = upload_cache.get(digest)
+    if cached is not None:
+        return cached
+    
+    form = extract_form_fields(content) if PDF_EXTRACTION_MODE == "auto" else None
+    if form is not None:
+        # Each field is one question; its labels stand in for the page text
+        questions = [question["originalQuestion"] for section in form["sections"] for question in section["questions"]]
+        text = "\n".join([form["title"]] + questions).strip()
+        form_type = identify_form_type("\n".join([form["title"], form["subject"], form["first_page_text"]]))
+        result = {
+            "sha256": digest,
+            "extraction": "acroform",
+            "text": text,
+            "form_type": form_type if form_type != "Unknown" else identify_form_type(text),
+            "sections": form["sections"],
+            "chunks": sections_to_chunks(form["sections"])
+        }
+    else:
+        text = extract_text_from_pdf(content)
+        result = {
+            "sha256": digest,
+            "extraction": "text",
+            "text": text,
+            "form_type": identify_form_type(text) if text else "Unknown",
+            "chunks": chunk_document(text) if text else {"long_essay_questions": [], "short_answer_questions": []}
+        }
+    if text:
+        upload_cache.set(digest, result)
+    return result
+
 @app.post("/upload-pdf")
 async def upload_pdf(file: UploadFile = File(...)):
     """Upload and process a PDF document"""
@@ -367,23 +987,18 @@ async def upload_pdf(file: UploadFile = File(...)):
         # Read file content
         content = await file.read()
         
-        # Extract text from PDF
-        text = extract_text_from_pdf(content)
+        result = process_pdf(content)
         
-        if not text:
+        if not result["text"]:
             raise HTTPException(status_code=400, detail="Could not extract text from PDF")
         
-        # Identify form type
-        form_type = identify_form_type(text)
-        
-        # Chunk document
-        chunks = chunk_document(text)
-        
         return {
             "filename": file.filename,
-            "form_type": form_type,
-            "text_length": len(text),
-            "chunks": chunks,
+            "form_type": result["form_type"],
+            "text_length": len(result["text"]),
+            "extraction": result.get("extraction", "text"),
+            "sections": result.get("sections"),
+            "chunks": result["chunks"],
             "status": "success"
         }
         
@@ -391,53 +1006,44 @@ async def upload_pdf(file: UploadFile = File(...)):
         raise HTTPException(status_code=500, detail=f"Error processing PDF: {str(e)}")
 
 @app.post("/analyze-document")
-async def analyze_document(request: dict):
+def analyze_document(request: dict):
     """Analyze document with AI and provide simplified explanations"""
     try:
         text = request.get("text", "")
         form_type = request.get("form_type", "Unknown")
         language = request.get("language", "en")
         
-        if not text:
-            raise HTTPException(status_code=400, detail="No text provided")
+        # Known forms can be analyzed from the precomputed questions without any text
+        chunks = structured_form_questions(form_type) if not text else None
+        if chunks is None:
+            if not text:
+                raise HTTPException(status_code=400, detail="No text provided")
+            
+            # Chunk the document
+            chunks = chunk_document(text)
         
-        # Chunk the document
-        chunks = chunk_document(text)
+        leqs, short_questions = questions_to_analyze(chunks)
         
-        # Process LEQs with Ollama
-        processed_leqs = []
-        for leq in chunks["long_essay_questions"]:
-            simplified = simplify_question_with_ollama(leq)
-            
-            # Translate if needed
-            translated = simplified
-            if language != "en":
-                translated = translate_text_with_ollama(simplified, language)
-            
-            processed_leqs.append({
-                "original": leq,
-                "simplified": simplified,
-                "translated": translated,
-                "language": language
-            })
+        # Incremental mode: only questions that are new or changed since that analysis are processed
+        previous_analysis_id = request.get("previous_analysis_id")
+        previous = analysis_cache.get(previous_analysis_id) if previous_analysis_id else None
         
-        # Process short questions
-        processed_short = []
-        for question in chunks["short_answer_questions"][:10]:  # Limit to first 10
-            simplified = simplify_question_with_ollama(question)
-            
-            translated = simplified
-            if language != "en":
-                translated = translate_text_with_ollama(simplified, language)
-            
-            processed_short.append({
-                "original": question,
-                "simplified": simplified,
-                "translated": translated,
-                "language": language
-            })
+        processed = process_questions(leqs + short_questions, language, previous)
+        settle(llm_generations(processed, language))
+        processed_leqs = processed[:len(leqs)]
+        processed_short = processed[len(leqs):]
+        
+        analysis_id = uuid.uuid4().hex
+        analysis_cache.set(analysis_id, {"language": language, "items": processed})
         
         return {
+            "analysis_id": analysis_id,
+            "incremental": {
+                "previous_analysis_id": previous_analysis_id,
+                "previous_found": previous is not None,
+                "reused_simplifications": sum(1 for item in processed if item["tiers"]["simplified"] == TIER_REUSED),
+                "reused_translations": sum(1 for item in processed if language != "en" and item["tiers"]["translated"] == TIER_REUSED)
+            },
             "form_type": form_type,
             "analysis": {
                 "long_essay_questions": processed_leqs,
@@ -457,8 +1063,12 @@ async def analyze_document(request: dict):
         raise HTTPException(status_code=500, detail=f"Error analyzing document: {str(e)}")
 
 @app.post("/ask-question")
-async def ask_question(request: dict):
-    """Ask a question to the AI assistant"""
+def ask_question(request: dict):
+    """Ask a question to the AI assistant
+
+    Conversations are kept server side: pass back the returned session_id and send
+    only the new question; context only needs to be sent when it changes.
+    """
     try:
         question = request.get("question", "")
         context = request.get("context", "")
@@ -467,24 +1077,23 @@ async def ask_question(request: dict):
         if not question:
             raise HTTPException(status_code=400, detail="No question provided")
         
-        # Create context-aware prompt
-        prompt = f"""
-        You are NavigateHome.AI, a personal AI caseworker for immigrants. You help people navigate the complex US immigration system.
+        session_id = request.get("session_id") or uuid.uuid4().hex
+        session = session_store.load(session_id)
         
-        Context: {context}
+        # Only the question varies per call; the instructions are the shared system prefix, and the
+        # context and earlier turns arrive as the session's (bounded) history
+        context = cap_context(context) if context else ""
+        new_context = context if context and context != session["context"] else None
+        if new_context:
+            session["context"] = new_context
         
-        User Question: {question}
+        response, tier = call_ollama_tiered(question, profile="chat", system=CHAT_SYSTEM_PROMPT, history=history_messages(session))
         
-        Provide a helpful, accurate, and empathetic response. Include:
-        - Clear, simple explanations
-        - Step-by-step guidance when appropriate
-        - Relevant resources or next steps
-        - Encouragement and support
-        
-        Keep your response conversational and easy to understand.
-        """
-        
-        response = call_ollama(prompt)
+        if tier != TIER_FAILED:
+            session = session_store.add_turn(session_id, question, response, new_context)
+            # Summarizing runs off the request path, on the shared LLM scheduler
+            if session_store.needs_compaction(session):
+                llm_pool.submit(session_store.compact, session_id, summarize_conversation)
         
         # Translate response if needed
         translated_response = response
@@ -496,6 +1105,12 @@ async def ask_question(request: dict):
             "response": response,
             "translated_response": translated_response,
             "language": language,
+            "session_id": session_id,
+            "session": {
+                "turns": (len(session["turns"]) + session["summarized_turns"]) // 2,
+                "summarized_turns": session["summarized_turns"] // 2,
+                "history_tokens": history_tokens(session)
+            },
             "timestamp": datetime.now().isoformat()
         }
         
@@ -503,7 +1118,7 @@ async def ask_question(request: dict):
         raise HTTPException(status_code=500, detail=f"Error processing question: {str(e)}")
 
 @app.post("/translate-document")
-async def translate_document(request: dict):
+def translate_document(request: dict):
     """Translate document content to target language"""
     try:
         text = request.get("text", "")
@@ -512,53 +1127,262 @@ async def translate_document(request: dict):
         if not text:
             raise HTTPException(status_code=400, detail="No text provided")
         
-        translated_text = translate_text_with_ollama(text, target_language)
+        chunks = split_for_translation(text, TRANSLATE_CHUNK_TOKENS)
+        events = translation_events(text, chunks, target_language)
+        if request.get("stream"):
+            # NDJSON: partial translations arrive as soon as their chunk is done
+            lines = (json.dumps(event, ensure_ascii=False) + "\n" for event in events)
+            return StreamingResponse(lines, media_type="application/x-ndjson")
         
-        return {
-            "original_text": text,
-            "translated_text": translated_text,
-            "target_language": target_language,
-            "status": "success"
-        }
+        # The last event is the reassembled document
+        return list(events)[-1]
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error translating document: {str(e)}")
 
-@app.get("/leq-dataset")
-async def get_leq_dataset():
-    """Get the complete LEQ dataset"""
-    return {
-        "leq_dataset": LEQ_DATASET,
-        "translations": TRANSLATIONS,
+# Uploads to /batch-analyze are held in memory; larger batches belong to the batch.py CLI
+BATCH_MAX_ARCHIVE_BYTES = int(os.getenv("BATCH_MAX_ARCHIVE_BYTES", str(100 * 1024 * 1024)))
+BATCH_MAX_DOCUMENTS = int(os.getenv("BATCH_MAX_DOCUMENTS", "500"))
+
+@app.post("/batch-analyze")
+def batch_analyze(file: UploadFile = File(...), language: str = Form("en")):
+    """Analyze every PDF in a .zip or .tar archive; streams JSON Lines, one per document as it finishes, then a summary"""
+    import batch
+    
+    content = file.file.read(BATCH_MAX_ARCHIVE_BYTES + 1)
+    if len(content) > BATCH_MAX_ARCHIVE_BYTES:
+        raise HTTPException(status_code=413, detail=f"Archive larger than {BATCH_MAX_ARCHIVE_BYTES} bytes")
+    try:
+        count = batch.count_archive_documents(content)
+    except batch.DocumentTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Error reading archive: {str(e)}")
+    
+    if not count:
+        raise HTTPException(status_code=400, detail="No PDF files found in archive")
+    if count > BATCH_MAX_DOCUMENTS:
+        raise HTTPException(status_code=413, detail=f"Archive has {count} PDFs, the limit is {BATCH_MAX_DOCUMENTS}")
+    
+    documents = batch.iter_archive(file.filename, content)
+    lines = (json.dumps(line, ensure_ascii=False) + "\n" for line in batch.run_batch(documents, language))
+    return StreamingResponse(lines, media_type="application/x-ndjson")
+
+# Fields a client may select for each LEQ in /leq-dataset
+LEQ_FIELDS = ("original", "simplified", "translation_key")
+
+@lru_cache(maxsize=256)
+def leq_dataset_page(form: Optional[str], languages: Optional[Tuple[str, ...]], fields: Optional[Tuple[str, ...]],
+                     offset: int, limit: Optional[int]) -> bytes:
+    """Serialized /leq-dataset response for one projection and page, built once"""
+    items = [(form_code, leq) for form_code, leqs in LEQ_DATASET.items() if form in (None, form_code) for leq in leqs]
+    page, next_cursor = paginate(items, offset, limit)
+    
+    leq_dataset: Dict[str, List[Dict[str, Any]]] = {}
+    for form_code, leq in page:
+        leq_dataset.setdefault(form_code, []).append(project(leq, fields))
+    
+    # A filtered or paged response only carries the translations its LEQs use
+    subset = form is not None or limit is not None
+    keys = {leq["translation_key"] for _, leq in page}
+    translations = {
+        language: {key: text for key, text in table.items() if key in keys} if subset else table
+        for language, table in TRANSLATIONS.items() if languages is None or language in languages
+    }
+    
+    body = {
+        "leq_dataset": leq_dataset,
+        "translations": translations,
         "total_forms": len(LEQ_DATASET),
         "total_leqs": sum(len(leqs) for leqs in LEQ_DATASET.values())
     }
+    if limit is not None:
+        body["next_cursor"] = next_cursor
+    return serialize(body)
 
-@app.get("/health")
-async def health_check():
-    """Health check endpoint"""
+# The unfiltered dataset, kept out of the LRU so other projections can never evict it
+_leq_dataset_full: Optional[bytes] = None
+
+def leq_dataset_full() -> bytes:
+    global _leq_dataset_full
+    if _leq_dataset_full is None:
+        _leq_dataset_full = leq_dataset_page.__wrapped__(None, None, None, 0, None)
+    return _leq_dataset_full
+
+@app.get("/leq-dataset")
+async def get_leq_dataset(language: str = None, fields: str = None, form: str = None, cursor: str = None, limit: int = None):
+    """Get the complete LEQ dataset
+
+    Optional query parameters trim it: language=es,zh keeps those translation tables,
+    fields=original,simplified projects each LEQ, form=I-485 picks one form, and
+    limit/cursor page through the LEQs (follow next_cursor).
+    """
+    if form is not None and form.upper() not in LEQ_DATASET:
+        raise HTTPException(status_code=404, detail="Form not found")
     try:
-        # Test Ollama connection
-        test_response = call_ollama("Hello, are you working?")
-        ollama_status = "connected" if test_response else "disconnected"
-        
-        return {
-            "status": "healthy",
-            "ollama_status": ollama_status,
-            "timestamp": datetime.now().isoformat()
-        }
-    except Exception as e:
-        return {
-            "status": "unhealthy",
-            "error": str(e),
-            "timestamp": datetime.now().isoformat()
+        offset, limit = page_bounds(cursor, limit)
+        query = (
+            form.upper() if form else None,
+            parse_list(language, list(LANGUAGE_NAMES) + ["en"], "language"),
+            parse_list(fields, LEQ_FIELDS, "fields")
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if query == (None, None, None) and limit is None:
+        body = leq_dataset_full()
+    else:
+        # Offsets past the end all mean the same empty page
+        total = sum(len(leqs) for form_code, leqs in LEQ_DATASET.items() if query[0] in (None, form_code))
+        body = leq_dataset_page(*query, min(offset, total), limit)
+    return Response(content=body, media_type="application/json")
+
+# Readiness probes hit Ollama's model list, never a generation, and are cached briefly
+HEALTH_CACHE_TTL = float(os.getenv("HEALTH_CACHE_TTL", "5"))
+_readiness_lock = threading.Lock()
+_readiness_cache = {"checked_at": 0.0, "result": None, "refreshing": False}
+_readiness_cache_stats = {"hits": 0, "misses": 0}
+
+def model_is_listed(model: str, tags: Dict[str, Any]) -> bool:
+    """Check whether a model appears in an Ollama /api/tags response"""
+    for entry in tags.get("models", []):
+        name = entry.get("name", "")
+        if name == model or name.split(":")[0] == model:
+            return True
+    return False
+
+def check_ollama_ready() -> Dict[str, Any]:
+    """Probe every Ollama backend's model list, reusing the result for HEALTH_CACHE_TTL seconds
+
+    The probes run outside the lock; while one caller refreshes an expired result the
+    others get the previous one instead of waiting on unreachable nodes.
+    """
+    with _readiness_lock:
+        cached = _readiness_cache["result"]
+        fresh = cached is not None and time.monotonic() - _readiness_cache["checked_at"] < HEALTH_CACHE_TTL
+        if fresh or (cached is not None and _readiness_cache["refreshing"]):
+            _readiness_cache_stats["hits"] += 1
+            CACHE_LOOKUPS.inc(cache="readiness", result="hit")
+            return cached
+        _readiness_cache_stats["misses"] += 1
+        CACHE_LOOKUPS.inc(cache="readiness", result="miss")
+        _readiness_cache["refreshing"] = True
+
+    try:
+        backends = []
+        for probe in ollama_router.probe("/api/tags"):
+            backends.append({
+                "url": probe["url"],
+                "reachable": probe["ok"],
+                # Listed in /api/tags: pulled on the node, not necessarily loaded in memory
+                "model_available": probe["ok"] and model_is_listed(OLLAMA_MODEL, probe["data"]),
+                "latency_ms": probe["latency_ms"]
+            })
+        result = {
+            "ready": warmup_state["completed"] and any(backend["model_available"] for backend in backends),
+            "model": OLLAMA_MODEL,
+            "backends": backends,
+            "checked_at": datetime.now().isoformat()
         }
+        with _readiness_lock:
+            _readiness_cache["result"] = result
+            _readiness_cache["checked_at"] = time.monotonic()
+    finally:
+        with _readiness_lock:
+            _readiness_cache["refreshing"] = False
+    return result
+
+@app.get("/health/live")
+async def liveness_check():
+    """Liveness probe: the process is up and serving requests"""
+    return {"status": "alive", "timestamp": datetime.now().isoformat()}
+
+@app.get("/health/ready")
+def readiness_check():
+    """Readiness probe: at least one Ollama backend has the configured model"""
+    readiness = check_ollama_ready()
+    pool = ollama_router.stats()
+    
+    body = {
+        "status": "ready" if readiness["ready"] else "not_ready",
+        "ollama": readiness,
+        "warmup": warmup_state,
+        "pool": pool,
+        "queue": {
+            "in_flight": pool["in_flight"]
+        },
+        "cache": {
+            "readiness": {
+                "ttl_seconds": HEALTH_CACHE_TTL,
+                **_readiness_cache_stats
+            },
+            "llm": llm_cache.stats(),
+            "upload": upload_cache.stats(),
+            "sessions": session_store.stats()
+        },
+        "structured": get_structured_index().stats(),
+        "translation_packs": translation_packs.stats(),
+        "rate_limit": rate_limiter.stats() if rate_limiter is not None else None,
+        "timestamp": datetime.now().isoformat()
+    }
+    return JSONResponse(status_code=200 if readiness["ready"] else 503, content=body)
+
+@app.get("/metrics")
+async def metrics():
+    """Prometheus metrics"""
+    for backend in ollama_router.stats()["backends"]:
+        OLLAMA_IN_FLIGHT.set(backend["outstanding"], backend=backend["url"])
+        OLLAMA_BACKEND_UP.set(0 if backend["state"] == "open" else 1, backend=backend["url"])
+    return Response(content=REGISTRY.render(), media_type=METRICS_CONTENT_TYPE)
+
+def require_admin(token: str):
+    if not profiler.token_matches(ADMIN_TOKEN, token):
+        raise HTTPException(status_code=403, detail="Admin token required")
+
+@app.get("/admin/profile", response_class=PlainTextResponse)
+def profile_worker(seconds: float = 10.0, interval_ms: float = 5.0, x_admin_token: str = Header(None)):
+    """Sample every thread of this worker for N seconds and return collapsed stacks"""
+    require_admin(x_admin_token)
+    seconds = min(max(seconds, 0.1), PROFILE_MAX_SECONDS)
+    
+    try:
+        result = profiler.profile_for(seconds, interval=max(interval_ms, 1.0) / 1000)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    
+    summary = result.summary()
+    return PlainTextResponse(result.collapsed(), headers={
+        "X-Profile-Ticks": str(summary["ticks"]),
+        "X-Profile-Duration": str(summary["duration_s"]),
+        "Content-Disposition": f'attachment; filename="profile-{os.getpid()}.collapsed"'
+    })
+
+@app.get("/admin/profile/{profile_id}", response_class=PlainTextResponse)
+async def get_request_profile(profile_id: str, x_admin_token: str = Header(None)):
+    """Collapsed stacks for a request profiled with the X-Profile header"""
+    require_admin(x_admin_token)
+    result = profiler.get_profile(profile_id)
+    if result is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return PlainTextResponse(result.collapsed())
+
+@app.get("/health")
+def health_check():
+    """Health check endpoint (cheap, backed by the cached readiness probe)"""
+    readiness = check_ollama_ready()
+    
+    return {
+        "status": "healthy" if readiness["ready"] else "unhealthy",
+        "ollama_status": "connected" if readiness["ready"] else "disconnected",
+        "timestamp": datetime.now().isoformat()
+    }
 
 if __name__ == "__main__":
     print("🚀 Starting NavigateHome.AI API...")
     print("📋 USCIS Forms loaded:", len(USCIS_FORMS))
     print("📝 LEQ Dataset loaded:", sum(len(leqs) for leqs in LEQ_DATASET.values()), "questions")
     print("🌍 Translation support for", len(TRANSLATIONS), "languages")
-    print("🤖 Ollama endpoint:", OLLAMA_BASE_URL)
+    print("🤖 Ollama endpoints:", ", ".join(OLLAMA_BASE_URLS))
+    
+    import uvicorn
     
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -1,14 +1,17 @@
 from fastapi import FastAPI, File, UploadFile, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
-import uvicorn
 import json
 import os
 import re
 from datetime import datetime
 from typing import List, Dict, Any, Optional
-import PyPDF2
+from functools import lru_cache
 import io
+from fastapi.responses import Response
+from metrics import REGISTRY, CONTENT_TYPE as METRICS_CONTENT_TYPE
+from tracing import instrument_app, span
+from projection import page_bounds, paginate, parse_list, project, serialize
 
 app = FastAPI(title="NavigateHome.AI API", version="2.0.0")
 
@@ -19,8 +22,12 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing"],
 )
 
+# Request latency metrics and per-stage Server-Timing header
+instrument_app(app)
+
 # NavigateHome AI Document Parser System
 class NavigateHomeAI:
     def __init__(self):
@@ -370,12 +377,26 @@ I can help in English, Spanish, Chinese, Arabic, and more!
 
 **What specific immigration help do you need?**"""
 
-# Initialize NavigateHome AI
-navigatehome_ai = NavigateHomeAI()
+# Initialize NavigateHome AI on first use so importing the module stays cheap
+@lru_cache(maxsize=None)
+def get_navigatehome_ai() -> NavigateHomeAI:
+    """Shared NavigateHomeAI instance, built on first use"""
+    return NavigateHomeAI()
+
+def preload():
+    """Build the datasets and import PDF support ahead of time (serve.py calls this before forking)"""
+    import PyPDF2  # noqa: F401
+    
+    # Pre-serialize the full form responses, the most requested ones
+    for form_code in get_navigatehome_ai().forms_data:
+        form_details_full(form_code)
 
+@span("extract")
 def extract_text_from_pdf(file_content: bytes) -> str:
     """Extract text from PDF file"""
     try:
+        import PyPDF2
+        
         pdf_file = io.BytesIO(file_content)
         pdf_reader = PyPDF2.PdfReader(pdf_file)
         
@@ -388,6 +409,7 @@ def extract_text_from_pdf(file_content: bytes) -> str:
         print(f"Error extracting PDF text: {e}")
         return ""
 
+@span("identify")
 def identify_form_type(text: str) -> str:
     """Identify the USCIS form type from text"""
     text_upper = text.upper()
@@ -412,7 +434,7 @@ async def root():
 async def get_forms():
     """Get all available USCIS forms"""
     forms_summary = {}
-    for form_code, form_data in navigatehome_ai.forms_data.items():
+    for form_code, form_data in get_navigatehome_ai().forms_data.items():
         forms_summary[form_code] = {
             "name": form_data["name"],
             "description": form_data["description"],
@@ -421,17 +443,79 @@ async def get_forms():
         }
     return {"forms": forms_summary}
 
+# Fields a client may select for each question in /forms/{form_code}
+QUESTION_FIELDS = (
+    "id", "originalQuestion", "simplifiedQuestion", "type",
+    "helpText", "requiredDocuments", "commonMistakes", "translatedLanguage"
+)
+
+@lru_cache(maxsize=256)
+def form_details_page(form_code: str, language: Optional[str], fields: Optional[tuple], offset: int, limit: Optional[int]) -> bytes:
+    """Serialized /forms/{form_code} response for one projection and page, built once"""
+    navigatehome_ai = get_navigatehome_ai()
+    form_data = navigatehome_ai.forms_data[form_code]
+    
+    # Questions are paged across sections; each page keeps its section grouping
+    questions = [(section["sectionTitle"], question) for section in form_data["sections"] for question in section["questions"]]
+    page, next_cursor = paginate(questions, offset, limit)
+    
+    sections = []
+    for title, question in page:
+        if language:
+            question = navigatehome_ai.batch_translate_questions([question], language)[0]
+        if not sections or sections[-1]["sectionTitle"] != title:
+            sections.append({"sectionTitle": title, "questions": []})
+        sections[-1]["questions"].append(project(question, fields))
+    
+    body = {
+        "form_code": form_code,
+        "form_data": {
+            "name": form_data["name"],
+            "description": form_data["description"],
+            "sections": sections
+        }
+    }
+    if limit is not None:
+        body["total_questions"] = len(questions)
+        body["next_cursor"] = next_cursor
+    return serialize(body)
+
+# Unfiltered form responses, kept out of the LRU so other projections can never evict them
+_form_details_full: Dict[str, bytes] = {}
+
+def form_details_full(form_code: str) -> bytes:
+    if form_code not in _form_details_full:
+        _form_details_full[form_code] = form_details_page.__wrapped__(form_code, None, None, 0, None)
+    return _form_details_full[form_code]
+
 @app.get("/forms/{form_code}")
-async def get_form_details(form_code: str):
-    """Get details for a specific form"""
-    if form_code.upper() not in navigatehome_ai.forms_data:
+async def get_form_details(form_code: str, language: str = None, fields: str = None, cursor: str = None, limit: int = None):
+    """Get details for a specific form
+
+    Optional query parameters trim the response: fields=id,simplifiedQuestion projects
+    each question, language=es swaps in translated questions, and limit/cursor page
+    through the questions (follow next_cursor).
+    """
+    if form_code.upper() not in get_navigatehome_ai().forms_data:
         raise HTTPException(status_code=404, detail="Form not found")
     
-    form_data = navigatehome_ai.forms_data[form_code.upper()]
-    return {
-        "form_code": form_code.upper(),
-        "form_data": form_data
-    }
+    try:
+        offset, limit = page_bounds(cursor, limit)
+        languages = parse_list(language, list(get_navigatehome_ai().translations) + ["en"], "language")
+        if languages is not None and len(languages) > 1:
+            raise ValueError("Only one language can be requested")
+        fields = parse_list(fields, QUESTION_FIELDS, "fields")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    language = languages[0] if languages else None
+    if language is None and fields is None and limit is None:
+        body = form_details_full(form_code.upper())
+    else:
+        # Offsets past the end all mean the same empty page
+        total = sum(len(section["questions"]) for section in get_navigatehome_ai().forms_data[form_code.upper()]["sections"])
+        body = form_details_page(form_code.upper(), language, fields, min(offset, total), limit)
+    return Response(content=body, media_type="application/json")
 
 @app.post("/upload-pdf")
 async def upload_pdf(file: UploadFile = File(...)):
@@ -469,11 +553,11 @@ async def analyze_document(request: dict):
         form_type = request.get("form_type", "Unknown")
         language = request.get("language", "en")
         
-        if form_type == "Unknown" or form_type not in navigatehome_ai.forms_data:
+        if form_type == "Unknown" or form_type not in get_navigatehome_ai().forms_data:
             raise HTTPException(status_code=400, detail="Form type not supported")
         
         # Parse the document
-        parsed_document = navigatehome_ai.parse_immigration_document("", form_type)
+        parsed_document = get_navigatehome_ai().parse_immigration_document("", form_type)
         
         if "error" in parsed_document:
             raise HTTPException(status_code=400, detail=parsed_document["error"])
@@ -484,10 +568,10 @@ async def analyze_document(request: dict):
             all_questions.extend(section["questions"])
         
         # Translate questions if needed
-        translated_questions = navigatehome_ai.batch_translate_questions(all_questions, language)
+        translated_questions = get_navigatehome_ai().batch_translate_questions(all_questions, language)
         
         # Chunk questions by type
-        chunked_questions = navigatehome_ai.chunk_document(translated_questions)
+        chunked_questions = get_navigatehome_ai().chunk_document(translated_questions)
         
         return {
             "form_type": form_type,
@@ -521,7 +605,7 @@ async def ask_question(request: dict):
             raise HTTPException(status_code=400, detail="No question provided")
         
         # Generate AI response
-        response = navigatehome_ai.generate_ai_response(question, context, language)
+        response = get_navigatehome_ai().generate_ai_response(question, context, language)
         
         return {
             "question": question,
@@ -556,6 +640,17 @@ async def translate_document(request: dict):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error translating document: {str(e)}")
 
+@app.get("/metrics")
+async def metrics():
+    """Prometheus metrics"""
+    return Response(content=REGISTRY.render(), media_type=METRICS_CONTENT_TYPE)
+
+@app.get("/health/live")
+async def liveness_check():
+    """Liveness probe: the process is up and serving requests"""
+    return {"status": "alive", "timestamp": datetime.now().isoformat()}
+
+@app.get("/health/ready")
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
@@ -563,15 +658,15 @@ async def health_check():
         "status": "healthy",
         "ai_system": "NavigateHome AI Document Parser",
         "version": "2.0.0",
-        "forms_loaded": len(navigatehome_ai.forms_data),
-        "languages_supported": len(navigatehome_ai.translations),
+        "forms_loaded": len(get_navigatehome_ai().forms_data),
+        "languages_supported": len(get_navigatehome_ai().translations),
         "timestamp": datetime.now().isoformat()
     }
 
 if __name__ == "__main__":
     print("🚀 Starting NavigateHome.AI API v2.0...")
-    print("📋 Forms loaded:", len(navigatehome_ai.forms_data))
-    print("🌍 Languages supported:", len(navigatehome_ai.translations))
     print("🤖 AI System: NavigateHome AI Document Parser")
     
+    import uvicorn
+    
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -0,0 +1,290 @@
+"""Analyze a whole batch of PDFs: a directory, or a .zip/.tar archive of them
+
+    python batch.py ./client-pdfs --language es --output results.jsonl
+    python batch.py uploads.zip --workers 8
+
+Documents flow through a bounded window: each is extracted in a process pool
+(PDF parsing is CPU bound and holds the GIL), then its questions are simplified
+and translated on the shared LLM scheduler (api.llm_pool, bounded by the Ollama
+slots). Identical files and questions repeated across documents (the same form
+filled in by many clients) are processed once.
+
+Output is JSON Lines: one line per document in input order, written as soon as
+that document is done, then a summary line with docs/minute.
+"""
+import argparse
+import hashlib
+import io
+import json
+import math
+import multiprocessing
+import os
+import sys
+import tarfile
+import threading
+import time
+import zipfile
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Deque, Dict, Iterable, Iterator, Tuple
+
+import api
+from ratelimit import settle
+from resolver import normalize_text
+
+
+# Largest PDF read out of an archive. Checked against the sizes the archive declares,
+# before anything is inflated, so a small zip cannot expand into gigabytes in memory
+BATCH_MAX_DOCUMENT_BYTES = int(os.getenv("BATCH_MAX_DOCUMENT_BYTES", str(50 * 1024 * 1024)))
+
+
+class DocumentTooLargeError(ValueError):
+    pass
+
+
+def _check_size(name: str, size: int, max_bytes: int):
+    if size > max_bytes:
+        raise DocumentTooLargeError(f"{name} is {size} bytes uncompressed, the limit is {max_bytes}")
+
+
+def iter_archive(name: str, content: bytes, max_bytes: int = BATCH_MAX_DOCUMENT_BYTES) -> Iterator[Tuple[str, bytes]]:
+    """PDF members of a zip or tar archive; raises DocumentTooLargeError on a member over `max_bytes`"""
+    if zipfile.is_zipfile(io.BytesIO(content)):
+        with zipfile.ZipFile(io.BytesIO(content)) as archive:
+            for member in archive.infolist():
+                if not member.is_dir() and member.filename.lower().endswith(".pdf"):
+                    _check_size(member.filename, member.file_size, max_bytes)
+                    # Reads stop at the declared file_size, so the check above bounds memory
+                    yield member.filename, archive.read(member)
+        return
+    try:
+        archive = tarfile.open(fileobj=io.BytesIO(content))
+    except tarfile.TarError:
+        raise ValueError(f"{name} is not a zip or tar archive")
+    with archive:
+        for member in archive.getmembers():
+            if member.isfile() and member.name.lower().endswith(".pdf"):
+                _check_size(member.name, member.size, max_bytes)
+                yield member.name, archive.extractfile(member).read()
+
+
+def count_archive_documents(content: bytes, max_bytes: int = BATCH_MAX_DOCUMENT_BYTES) -> int:
+    """PDF members of a zip or tar archive, counted and size checked without reading them"""
+    if zipfile.is_zipfile(io.BytesIO(content)):
+        with zipfile.ZipFile(io.BytesIO(content)) as archive:
+            members = [(member.filename, member.file_size) for member in archive.infolist()
+                       if not member.is_dir() and member.filename.lower().endswith(".pdf")]
+    else:
+        with tarfile.open(fileobj=io.BytesIO(content)) as archive:
+            members = [(member.name, member.size) for member in archive.getmembers()
+                       if member.isfile() and member.name.lower().endswith(".pdf")]
+    for name, size in members:
+        _check_size(name, size, max_bytes)
+    return len(members)
+
+
+def iter_documents(path: str) -> Iterator[Tuple[str, bytes]]:
+    """(name, content) for every PDF under a directory, in an archive, or a single PDF"""
+    if os.path.isdir(path):
+        for root, _, files in sorted(os.walk(path)):
+            for filename in sorted(files):
+                if filename.lower().endswith(".pdf"):
+                    full_path = os.path.join(root, filename)
+                    with open(full_path, "rb") as f:
+                        yield os.path.relpath(full_path, path), f.read()
+        return
+    with open(path, "rb") as f:
+        content = f.read()
+    if path.lower().endswith(".pdf"):
+        yield os.path.basename(path), content
+    else:
+        yield from iter_archive(path, content)
+
+
+def extract_document(content: bytes) -> Dict[str, Any]:
+    """Runs in a worker process: text extraction, form identification and chunking"""
+    result = api.process_pdf(content)
+    # The full text stays in the worker; only what the analysis needs is sent back
+    return {
+        "form_type": result["form_type"],
+        "extraction": result.get("extraction", "text"),
+        "chunks": result["chunks"],
+        "has_text": bool(result["text"])
+    }
+
+
+# Documents in flight at once: extracted or being resolved, not yet written out
+BATCH_WINDOW = int(os.getenv("BATCH_WINDOW", "16"))
+BATCH_EXTRACT_WORKERS = int(os.getenv("BATCH_EXTRACT_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+_extraction_pool = None
+_extraction_pool_lock = threading.Lock()
+
+
+def extraction_pool() -> ProcessPoolExecutor:
+    """Process pool shared by every batch in this process, so workers import api once
+
+    Spawned rather than forked workers, since the server calls this from a process
+    full of threads.
+    """
+    global _extraction_pool
+    with _extraction_pool_lock:
+        if _extraction_pool is None:
+            context = multiprocessing.get_context("spawn")
+            _extraction_pool = ProcessPoolExecutor(max_workers=BATCH_EXTRACT_WORKERS, mp_context=context)
+        return _extraction_pool
+
+
+def resolve_question(question: str, language: str) -> Tuple[Tuple[str, str], Tuple[str, str]]:
+    """Simplification and translation of one question, as (text, tier) pairs"""
+    simplified = api.resolve_simplification(question)
+    translated = api.resolve_translation(simplified[0], language) if language != "en" else simplified
+    return simplified, translated
+
+
+def run_batch(documents: Iterable[Tuple[str, bytes]], language: str = "en", window: int = BATCH_WINDOW,
+              pool: ProcessPoolExecutor = None) -> Iterator[Dict[str, Any]]:
+    """Analyze every document; yields one result per document as soon as it is done, then a summary
+
+    At most `window` documents are in flight: extracting in the process pool, or with
+    their questions on the shared LLM scheduler. Identical files are extracted once and
+    every distinct question across the batch is resolved once.
+
+    Under a rate limit (see ratelimit.py) the model calls made so far are charged after
+    every document, and the batch stops once the client's bucket is in debt.
+    """
+    started = time.perf_counter()
+    pool = pool or extraction_pool()
+    extractions: Dict[str, Future] = {}
+    questions: Dict[str, Future] = {}
+    pending: Deque[Dict[str, Any]] = deque()
+    totals = {"documents": 0, "questions": 0, "generations": 0, "retry_after": 0.0}
+    charged = set()
+
+    def schedule(document: Dict[str, Any], result: Dict[str, Any]):
+        """Queue a document's questions, unless they are already queued for another document"""
+        leqs, short_questions = api.questions_to_analyze(result["chunks"])
+        document["questions"] = leqs + short_questions
+        document["leqs"] = len(leqs)
+        for question in document["questions"]:
+            key = normalize_text(question)
+            if key not in questions:
+                questions[key] = api.llm_pool.submit(resolve_question, question, language)
+
+    def schedule_extracted():
+        """Queue the questions of every waiting document whose extraction has finished"""
+        for document in pending:
+            extraction = extractions[document["sha256"]]
+            if document["questions"] is None and extraction.done() and extraction.exception() is None:
+                schedule(document, extraction.result())
+
+    def document_line(document: Dict[str, Any]) -> Dict[str, Any]:
+        name, digest = document["file"], document["sha256"]
+        try:
+            result = extractions[digest].result()
+        except Exception as e:
+            return {"file": name, "sha256": digest, "status": "error", "detail": f"Error processing PDF: {e}"}
+        if document["questions"] is None:
+            schedule(document, result)
+        if not result["has_text"]:
+            return {"file": name, "sha256": digest, "status": "error", "detail": "Could not extract text from PDF"}
+
+        items = []
+        for question in document["questions"]:
+            simplified, translated = questions[normalize_text(question)].result()
+            items.append(api.analysis_item(question, language, simplified, translated))
+        totals["questions"] += len(items)
+
+        # Each distinct question is charged once, by the model calls it actually took
+        new_items = []
+        for question, item in zip(document["questions"], items):
+            if normalize_text(question) not in charged:
+                charged.add(normalize_text(question))
+                new_items.append(item)
+        totals["generations"] += api.llm_generations(new_items, language)
+        return {
+            "file": name,
+            "sha256": digest,
+            "form_type": result["form_type"],
+            "extraction": result["extraction"],
+            "analysis": {
+                "long_essay_questions": items[:document["leqs"]],
+                "short_answer_questions": items[document["leqs"]:],
+                "total_questions": len(items)
+            },
+            "status": "success"
+        }
+
+    def finish(document: Dict[str, Any]) -> Dict[str, Any]:
+        """A document's output line; every document, failed or not, settles the charge so far"""
+        line = document_line(document)
+        totals["documents"] += 1
+        totals["retry_after"] = settle(totals["generations"]) or 0.0
+        return line
+
+    for name, content in documents:
+        if totals["retry_after"]:
+            break
+        digest = hashlib.sha256(content).hexdigest()
+        if digest not in extractions:
+            extractions[digest] = pool.submit(extract_document, content)
+        pending.append({"file": name, "sha256": digest, "questions": None, "leqs": 0})
+        schedule_extracted()
+        if len(pending) >= window:
+            yield finish(pending.popleft())
+
+    while pending and not totals["retry_after"]:
+        yield finish(pending.popleft())
+
+    if totals["retry_after"]:
+        # Queued work for the documents that will not be written is dropped
+        for future in list(questions.values()) + list(extractions.values()):
+            future.cancel()
+        yield {
+            "status": "rate_limited",
+            "detail": "Rate limit exceeded, the rest of the batch was not analyzed",
+            "retry_after": max(1, math.ceil(totals["retry_after"]))
+        }
+
+    elapsed = time.perf_counter() - started
+    yield {
+        "summary": True,
+        "documents": totals["documents"],
+        "unique_documents": len(extractions),
+        "questions": totals["questions"],
+        "unique_questions": len(questions),
+        "language": language,
+        "elapsed_seconds": round(elapsed, 2),
+        "docs_per_minute": round(totals["documents"] / elapsed * 60, 1) if elapsed else None,
+        "rate_limited": bool(totals["retry_after"])
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path", help="directory, .zip/.tar archive, or single PDF")
+    parser.add_argument("--language", default="en")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="extraction processes")
+    parser.add_argument("--window", type=int, default=BATCH_WINDOW, help="documents in flight at once")
+    parser.add_argument("--output", help="JSON Lines file (default: stdout)")
+    args = parser.parse_args()
+
+    output = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    pool = ProcessPoolExecutor(max_workers=args.workers, mp_context=multiprocessing.get_context("spawn"))
+    try:
+        for line in run_batch(iter_documents(args.path), args.language, args.window, pool):
+            output.write(json.dumps(line, ensure_ascii=False) + "\n")
+            if line.get("summary"):
+                print(
+                    f"{line['documents']} documents ({line['unique_questions']} distinct questions) "
+                    f"in {line['elapsed_seconds']}s: {line['docs_per_minute']} docs/minute",
+                    file=sys.stderr
+                )
+    finally:
+        pool.shutdown()
+        if output is not sys.stdout:
+            output.close()
+
+
+if __name__ == "__main__":
+    main()
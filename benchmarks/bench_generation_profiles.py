@@ -0,0 +1,110 @@
+"""Compare latency of the bounded generation profiles against unbounded generation
+
+Runs every LEQ_DATASET question through the simplify prompt twice against the
+Ollama backends in OLLAMA_BASE_URLS: once with the "simplify" profile and once
+with only the model set (Ollama defaults, no token cap).
+
+    python benchmarks/bench_generation_profiles.py --repeat 3
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+os.environ.setdefault("OLLAMA_WARMUP", "0")
+import api  # noqa: E402
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def run_variant(name, payloads, repeat):
+    latencies, tokens, tokens_per_second = [], [], []
+    errors = 0
+    for _ in range(repeat):
+        for payload in payloads:
+            started = time.perf_counter()
+            try:
+                result = api.ollama_router.post("/api/chat", payload, timeout=300)
+            except Exception as e:
+                print(f"{name}: {e}")
+                errors += 1
+                continue
+            latencies.append(time.perf_counter() - started)
+            tokens.append(result.get("eval_count", 0))
+            if result.get("eval_duration"):
+                tokens_per_second.append(result["eval_count"] / (result["eval_duration"] / 1e9))
+
+    return {
+        "variant": name,
+        "calls": len(latencies),
+        "errors": errors,
+        "latency_p50_s": round(percentile(latencies, 50), 4),
+        "latency_p95_s": round(percentile(latencies, 95), 4),
+        "latency_mean_s": round(statistics.mean(latencies), 4) if latencies else None,
+        "output_tokens_mean": round(statistics.mean(tokens), 1) if tokens else None,
+        "output_tokens_max": max(tokens) if tokens else None,
+        "tokens_per_second_mean": round(statistics.mean(tokens_per_second), 1) if tokens_per_second else None
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, text=True).strip()
+    except Exception:
+        return "unknown"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--profile", default="simplify", help="generation profile to benchmark")
+    parser.add_argument("--repeat", type=int, default=1, help="passes over the question set")
+    parser.add_argument("--output", default=os.path.join(ROOT, "benchmarks", "results", "generation_profiles.json"))
+    args = parser.parse_args()
+
+    questions = [leq["original"] for leqs in api.LEQ_DATASET.values() for leq in leqs]
+    bounded = [api.build_chat_payload(api.SIMPLIFY_SYSTEM_PROMPT, question, args.profile) for question in questions]
+    unbounded = [{key: value for key, value in payload.items() if key != "options"} for payload in bounded]
+
+    # Warm once so neither variant pays the model load
+    api.ollama_router.post("/api/generate", {"model": bounded[0]["model"], "keep_alive": api.OLLAMA_KEEP_ALIVE}, timeout=300)
+
+    results = [
+        run_variant("unbounded", unbounded, args.repeat),
+        run_variant(args.profile, bounded, args.repeat)
+    ]
+
+    report = {
+        "benchmark": "generation_profiles",
+        "revision": git_revision(),
+        "run_at": datetime.now().isoformat(),
+        "backends": api.OLLAMA_BASE_URLS,
+        "profile": {args.profile: api.GENERATION_PROFILES.get(args.profile)},
+        "questions": len(questions),
+        "results": results
+    }
+
+    os.makedirs(os.path.dirname(args.output), exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    for row in results:
+        print(f"{row['variant']:>10}  p50 {row['latency_p50_s']}s  p95 {row['latency_p95_s']}s  "
+              f"tokens mean {row['output_tokens_mean']} max {row['output_tokens_max']}  errors {row['errors']}")
+    print(f"Wrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
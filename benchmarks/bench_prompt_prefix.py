@@ -0,0 +1,159 @@
+"""Measure prefill saved by the stable-system-prefix prompt layout
+
+Replays a 40-question /analyze-document run (simplify + translate) twice against
+the Ollama backends in OLLAMA_BASE_URLS:
+
+- legacy: the original monolithic /api/generate prompts, with the question in the
+  middle of the instructions and simplify/translate calls interleaved
+- prefix: the current /api/chat layout, a fixed system prefix per template and all
+  simplifications before all translations
+
+Prefill cost is read from Ollama's prompt_eval_count / prompt_eval_duration.
+
+    python benchmarks/bench_prompt_prefix.py --language es
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+os.environ.setdefault("OLLAMA_WARMUP", "0")
+import api  # noqa: E402
+
+LEGACY_SIMPLIFY_PROMPT = """
+    You are an immigration expert helping non-native English speakers understand complex legal questions.
+
+    Simplify this immigration form question into plain, simple English that anyone can understand:
+
+    "{question}"
+
+    Requirements:
+    - Use simple words and short sentences
+    - Avoid legal jargon
+    - Make it conversational and friendly
+    - Keep the same meaning but make it much easier to understand
+    - Maximum 2 sentences
+
+    Simplified version:
+    """
+
+LEGACY_TRANSLATE_PROMPT = """
+    Translate the following text from English to {language}.
+    Keep the meaning and tone exactly the same.
+    Make sure it's natural and easy to understand in {language}.
+
+    Text to translate: "{text}"
+
+    Translation:
+    """
+
+
+def question_set(count):
+    questions = [leq["original"] for leqs in api.LEQ_DATASET.values() for leq in leqs]
+    return [f"Item {index + 1}. {questions[index % len(questions)]}" for index in range(count)]
+
+
+class Tally:
+    def __init__(self, name):
+        self.name = name
+        self.calls = 0
+        self.prompt_tokens = 0
+        self.prefill_seconds = 0.0
+        self.wall_seconds = 0.0
+
+    def send(self, path, payload):
+        started = time.perf_counter()
+        result = api.ollama_router.post(path, payload, timeout=300)
+        self.wall_seconds += time.perf_counter() - started
+        self.calls += 1
+        self.prompt_tokens += result.get("prompt_eval_count", 0)
+        self.prefill_seconds += result.get("prompt_eval_duration", 0) / 1e9
+        if "message" in result:
+            return result["message"].get("content", "")
+        return result.get("response", "")
+
+    def report(self):
+        return {
+            "variant": self.name,
+            "calls": self.calls,
+            "prompt_eval_tokens": self.prompt_tokens,
+            "prefill_seconds": round(self.prefill_seconds, 4),
+            "wall_seconds": round(self.wall_seconds, 4)
+        }
+
+
+def run_legacy(questions, language):
+    tally = Tally("legacy")
+    language_name = api.LANGUAGE_NAMES.get(language, language)
+    for question in questions:
+        simplified = tally.send("/api/generate", api.build_generate_payload(
+            LEGACY_SIMPLIFY_PROMPT.format(question=question), "simplify"))
+        if language != "en":
+            tally.send("/api/generate", api.build_generate_payload(
+                LEGACY_TRANSLATE_PROMPT.format(language=language_name, text=simplified), "translate"))
+    return tally.report()
+
+
+def run_prefix(questions, language):
+    tally = Tally("prefix")
+    simplified = [
+        tally.send("/api/chat", api.build_chat_payload(api.SIMPLIFY_SYSTEM_PROMPT, question, "simplify"))
+        for question in questions
+    ]
+    if language != "en":
+        system = api.translate_system_prompt(language)
+        for text in simplified:
+            tally.send("/api/chat", api.build_chat_payload(system, text, "translate"))
+    return tally.report()
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, text=True).strip()
+    except Exception:
+        return "unknown"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--questions", type=int, default=40)
+    parser.add_argument("--language", default="es")
+    parser.add_argument("--output", default=os.path.join(ROOT, "benchmarks", "results", "prompt_prefix.json"))
+    args = parser.parse_args()
+
+    questions = question_set(args.questions)
+    legacy = run_legacy(questions, args.language)
+    prefix = run_prefix(questions, args.language)
+
+    saved = legacy["prefill_seconds"] - prefix["prefill_seconds"]
+    report = {
+        "benchmark": "prompt_prefix",
+        "revision": git_revision(),
+        "run_at": datetime.now().isoformat(),
+        "backends": api.OLLAMA_BASE_URLS,
+        "questions": len(questions),
+        "language": args.language,
+        "results": [legacy, prefix],
+        "prefill_seconds_saved": round(saved, 4),
+        "prefill_tokens_saved": legacy["prompt_eval_tokens"] - prefix["prompt_eval_tokens"]
+    }
+
+    os.makedirs(os.path.dirname(args.output), exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    for row in report["results"]:
+        print(f"{row['variant']:>7}  calls {row['calls']}  prefill tokens {row['prompt_eval_tokens']}  "
+              f"prefill {row['prefill_seconds']}s  wall {row['wall_seconds']}s")
+    print(f"Prefill saved: {report['prefill_seconds_saved']}s ({report['prefill_tokens_saved']} tokens)")
+    print(f"Wrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
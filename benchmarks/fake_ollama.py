@@ -0,0 +1,211 @@
+"""Stand-in Ollama server with configurable latency and token-rate profiles
+
+Speaks enough of the Ollama HTTP API for the backends and benchmarks:
+/api/tags, /api/version, /api/ps, and non-streaming /api/generate and /api/chat.
+Responses carry the same timing fields as Ollama (load_duration,
+prompt_eval_count/duration, eval_count/duration). Generation time is simulated as
+
+    first_token_latency + new_prompt_tokens / prefill_rate + output_tokens / token_rate
+
+where new_prompt_tokens excludes the longest prefix shared with the previous prompt
+on the same slot, emulating the runner's KV prefix cache.
+
+    python benchmarks/fake_ollama.py --port 11434 --profile cpu
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+PROFILES = {
+    # Instant responses, for measuring the API's own overhead
+    "instant": {"first_token_ms": 0, "token_rate": 1e9, "prefill_rate": 1e9, "load_ms": 0, "slots": 64},
+    "gpu": {"first_token_ms": 30, "token_rate": 80, "prefill_rate": 2500, "load_ms": 2500, "slots": 4},
+    "cpu": {"first_token_ms": 150, "token_rate": 12, "prefill_rate": 150, "load_ms": 8000, "slots": 1},
+}
+
+
+def estimate_tokens(text):
+    return max(1, len(text) // 4)
+
+
+class FakeOllamaState:
+    def __init__(self, profile="gpu", models=("llama3.1",), output_tokens=48, error_rate=0.0, jitter=0.1, **overrides):
+        settings = dict(PROFILES[profile])
+        settings.update({key: value for key, value in overrides.items() if value is not None})
+        self.first_token = settings["first_token_ms"] / 1000
+        self.token_rate = settings["token_rate"]
+        self.prefill_rate = settings["prefill_rate"]
+        self.load_seconds = settings["load_ms"] / 1000
+        self.slots = threading.BoundedSemaphore(settings["slots"])
+        self.slot_prompts = [""] * settings["slots"]
+        self.models = list(models)
+        self.loaded = set()
+        self.output_tokens = output_tokens
+        self.error_rate = error_rate
+        self.jitter = jitter
+        self.lock = threading.Lock()
+        self.requests = 0
+
+    def reuse_slot(self, prompt):
+        """Claim the slot whose cached prompt shares the longest prefix with this one"""
+        with self.lock:
+            best, best_shared = 0, -1
+            for index, cached in enumerate(self.slot_prompts):
+                shared = 0
+                limit = min(len(cached), len(prompt))
+                while shared < limit and cached[shared] == prompt[shared]:
+                    shared += 1
+                if shared > best_shared:
+                    best, best_shared = index, shared
+            self.slot_prompts[best] = prompt
+            return best_shared
+
+    def generate(self, model, prompt, options):
+        with self.slots:
+            load = 0.0
+            with self.lock:
+                self.requests += 1
+                if model not in self.loaded:
+                    self.loaded.add(model)
+                    load = self.load_seconds
+
+            if prompt:
+                shared = self.reuse_slot(prompt)
+                prompt_tokens = estimate_tokens(prompt[shared:]) if shared < len(prompt) else 1
+            else:
+                prompt_tokens = 0
+            num_predict = options.get("num_predict", self.output_tokens)
+            output_tokens = self.output_tokens if num_predict is None or num_predict < 0 else min(num_predict, self.output_tokens)
+
+            prefill = prompt_tokens / self.prefill_rate
+            decode = output_tokens / self.token_rate
+            total = load + self.first_token + prefill + decode
+            total *= 1 + random.uniform(-self.jitter, self.jitter)
+            time.sleep(max(0.0, total))
+
+        return {
+            "model": model,
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "done": True,
+            "total_duration": int(total * 1e9),
+            "load_duration": int(load * 1e9),
+            "prompt_eval_count": prompt_tokens,
+            "prompt_eval_duration": int(prefill * 1e9),
+            "eval_count": output_tokens,
+            "eval_duration": int(decode * 1e9),
+            "text": " ".join(["word"] * output_tokens)
+        }
+
+
+def make_handler(state):
+    class FakeOllamaHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        def log_message(self, *args):
+            pass
+
+        def send_json(self, status, body):
+            encoded = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(encoded)))
+            self.end_headers()
+            self.wfile.write(encoded)
+
+        def do_GET(self):
+            if self.path == "/api/tags":
+                self.send_json(200, {"models": [{"name": f"{model}:latest", "model": f"{model}:latest"} for model in state.models]})
+            elif self.path == "/api/version":
+                self.send_json(200, {"version": "0.0.0-fake"})
+            elif self.path == "/api/ps":
+                self.send_json(200, {"models": [{"name": f"{model}:latest"} for model in sorted(state.loaded)]})
+            else:
+                self.send_json(404, {"error": "not found"})
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            body = json.loads(self.rfile.read(length) or b"{}")
+            model = body.get("model", "").split(":")[0]
+
+            if self.path not in ("/api/generate", "/api/chat"):
+                self.send_json(404, {"error": "not found"})
+                return
+            if model not in state.models:
+                self.send_json(404, {"error": f"model '{model}' not found"})
+                return
+            if state.error_rate and random.random() < state.error_rate:
+                self.send_json(500, {"error": "simulated failure"})
+                return
+
+            if self.path == "/api/chat":
+                prompt = "\n".join(message.get("content", "") for message in body.get("messages", []))
+            else:
+                prompt = (body.get("system") or "") + (body.get("prompt") or "")
+
+            # An empty request only loads the model, like Ollama's warm-up call
+            if not prompt:
+                result = state.generate(model, "", {"num_predict": 0})
+                result.pop("text")
+            else:
+                result = state.generate(model, prompt, body.get("options") or {})
+
+            text = result.pop("text", "")
+            if self.path == "/api/chat":
+                result["message"] = {"role": "assistant", "content": text}
+            else:
+                result["response"] = text
+            self.send_json(200, result)
+
+    return FakeOllamaHandler
+
+
+def start_fake_ollama(port=0, host="127.0.0.1", **state_options):
+    """Start a fake Ollama server on a background thread, returns (server, base_url)"""
+    state = FakeOllamaState(**state_options)
+    server = ThreadingHTTPServer((host, port), make_handler(state))
+    server.daemon_threads = True
+    server.state = state
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11434)
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="gpu")
+    parser.add_argument("--models", default="llama3.1", help="comma separated model names to advertise")
+    parser.add_argument("--output-tokens", type=int, default=48, help="tokens generated per call before num_predict")
+    parser.add_argument("--token-rate", type=float, help="override decode tokens/second")
+    parser.add_argument("--prefill-rate", type=float, help="override prefill tokens/second")
+    parser.add_argument("--first-token-ms", type=float, help="override fixed per-call latency")
+    parser.add_argument("--slots", type=int, help="override concurrent request slots")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    server, url = start_fake_ollama(
+        args.port, args.host,
+        profile=args.profile,
+        models=[model.strip() for model in args.models.split(",")],
+        output_tokens=args.output_tokens,
+        error_rate=args.error_rate,
+        token_rate=args.token_rate,
+        prefill_rate=args.prefill_rate,
+        first_token_ms=args.first_token_ms,
+        slots=args.slots
+    )
+    print(f"Fake Ollama ({args.profile}) listening on {url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
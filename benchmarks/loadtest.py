@@ -0,0 +1,256 @@
+"""Load test api.py and api_v2.py against a local fake Ollama server
+
+Starts the fake Ollama (benchmarks/fake_ollama.py) in-process, launches each target
+under uvicorn as a subprocess pointed at it, then drives a weighted mix of
+/upload-pdf, /analyze-document, /ask-question and /forms traffic from a pool of
+client threads. Reports p50/p95/p99 latency, throughput and error rate per endpoint
+and writes the report as JSON so runs from different commits can be compared.
+
+    python benchmarks/loadtest.py --target api api_v2 --duration 30 --concurrency 16
+    python benchmarks/loadtest.py --target api --compare benchmarks/results/loadtest-api-abc1234.json
+"""
+import argparse
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import requests
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, BENCH_DIR)
+
+from fake_ollama import PROFILES, start_fake_ollama  # noqa: E402
+from sample_pdf import sample_form_pdf, sample_form_text  # noqa: E402
+
+DEFAULT_MIX = "forms=4,upload=2,analyze=1,ask=2"
+
+QUESTIONS = [
+    "How do I apply for a green card through my spouse?",
+    "What documents do I need for the I-765 work permit?",
+    "Can I travel outside the US while my I-485 is pending?",
+    "How long does naturalization take?",
+]
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    if not ordered:
+        return None
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def parse_mix(spec):
+    mix = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        mix[name.strip()] = float(weight or 1)
+    return mix
+
+
+class Scenario:
+    """The request each traffic class sends"""
+
+    def __init__(self, base_url, language):
+        self.base_url = base_url
+        self.language = language
+        self.pdf = sample_form_pdf(2)
+        self.text = sample_form_text()
+
+    def send(self, session, kind):
+        if kind == "forms":
+            if random.random() < 0.5:
+                return "GET /forms", session.get(f"{self.base_url}/forms", timeout=120)
+            return "GET /forms/{code}", session.get(f"{self.base_url}/forms/I-485", timeout=120)
+        if kind == "upload":
+            files = {"file": ("i-485.pdf", self.pdf, "application/pdf")}
+            return "POST /upload-pdf", session.post(f"{self.base_url}/upload-pdf", files=files, timeout=120)
+        if kind == "analyze":
+            body = {"text": self.text, "form_type": "I-485", "language": self.language}
+            return "POST /analyze-document", session.post(f"{self.base_url}/analyze-document", json=body, timeout=300)
+        if kind == "ask":
+            body = {"question": random.choice(QUESTIONS), "language": self.language}
+            return "POST /ask-question", session.post(f"{self.base_url}/ask-question", json=body, timeout=300)
+        raise ValueError(f"Unknown traffic class {kind}")
+
+
+def start_target(module, port, ollama_url, extra_env):
+    env = dict(os.environ, OLLAMA_BASE_URLS=ollama_url, **extra_env)
+    # Every simulated client shares one address, so per-client limits would throttle the whole run
+    env.setdefault("RATE_LIMIT_ENABLED", "0")
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", f"{module}:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=ROOT, env=env
+    )
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"{module} exited with code {process.returncode}")
+        try:
+            if requests.get(f"http://127.0.0.1:{port}/health/live", timeout=1).ok:
+                return process
+        except requests.RequestException:
+            pass
+        time.sleep(0.1)
+    process.kill()
+    raise RuntimeError(f"{module} did not become live within 60s")
+
+
+def drive(scenario, mix, concurrency, duration, max_requests):
+    kinds, weights = zip(*mix.items())
+    samples = []
+    lock = threading.Lock()
+    stop_at = time.monotonic() + duration
+    issued = [0]
+
+    def worker():
+        session = requests.Session()
+        while time.monotonic() < stop_at:
+            with lock:
+                if max_requests and issued[0] >= max_requests:
+                    return
+                issued[0] += 1
+            kind = random.choices(kinds, weights)[0]
+            started = time.perf_counter()
+            try:
+                endpoint, response = scenario.send(session, kind)
+                ok = response.status_code < 400
+                status = response.status_code
+            except requests.RequestException as e:
+                endpoint, ok, status = kind, False, type(e).__name__
+            elapsed = time.perf_counter() - started
+            with lock:
+                samples.append((endpoint, elapsed, ok, status))
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        for _ in range(concurrency):
+            pool.submit(worker)
+    return samples, time.perf_counter() - started
+
+
+def summarize(samples, wall_seconds):
+    def stats(rows):
+        latencies = [row[1] for row in rows]
+        errors = [row for row in rows if not row[2]]
+        return {
+            "requests": len(rows),
+            "errors": len(errors),
+            "error_rate": round(len(errors) / len(rows), 4) if rows else 0.0,
+            "throughput_rps": round(len(rows) / wall_seconds, 2) if wall_seconds else 0.0,
+            "p50_ms": round(percentile(latencies, 50) * 1000, 1) if latencies else None,
+            "p95_ms": round(percentile(latencies, 95) * 1000, 1) if latencies else None,
+            "p99_ms": round(percentile(latencies, 99) * 1000, 1) if latencies else None,
+            "status_codes": {str(code): sum(1 for row in rows if row[3] == code) for code in sorted({str(row[3]) for row in rows})}
+        }
+
+    endpoints = sorted({row[0] for row in samples})
+    return {
+        "overall": stats(samples),
+        "endpoints": {endpoint: stats([row for row in samples if row[0] == endpoint]) for endpoint in endpoints}
+    }
+
+
+def compare(report, previous_path):
+    with open(previous_path, encoding="utf-8") as f:
+        previous = json.load(f)
+    print(f"\nCompared with {previous_path} (revision {previous.get('revision')}):")
+    for endpoint, current in report["summary"]["endpoints"].items():
+        before = previous["summary"]["endpoints"].get(endpoint)
+        if not before or not before["p95_ms"] or not current["p95_ms"]:
+            continue
+        change = (current["p95_ms"] - before["p95_ms"]) / before["p95_ms"] * 100
+        print(f"  {endpoint:<22} p95 {before['p95_ms']}ms -> {current['p95_ms']}ms ({change:+.1f}%)")
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, text=True).strip()
+    except Exception:
+        return "unknown"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target", nargs="+", default=["api", "api_v2"], choices=["api", "api_v2"])
+    parser.add_argument("--duration", type=float, default=20.0, help="seconds of traffic per target")
+    parser.add_argument("--requests", type=int, default=0, help="stop after this many requests (0 = duration only)")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"weighted traffic classes (default {DEFAULT_MIX})")
+    parser.add_argument("--language", default="es")
+    parser.add_argument("--ollama-profile", choices=sorted(PROFILES), default="gpu")
+    parser.add_argument("--ollama-nodes", type=int, default=1, help="fake Ollama servers to load balance across")
+    parser.add_argument("--output-dir", default=os.path.join(BENCH_DIR, "results"))
+    parser.add_argument("--compare", help="previous report to diff p95 latencies against")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    mix = parse_mix(args.mix)
+    revision = git_revision()
+    os.makedirs(args.output_dir, exist_ok=True)
+
+    for target in args.target:
+        servers = [start_fake_ollama(profile=args.ollama_profile) for _ in range(args.ollama_nodes)]
+        ollama_urls = ",".join(url for _, url in servers)
+        port = free_port()
+        process = start_target(target, port, ollama_urls, {"OLLAMA_KEEPALIVE_INTERVAL": "0"})
+        try:
+            scenario = Scenario(f"http://127.0.0.1:{port}", args.language)
+            samples, wall = drive(scenario, mix, args.concurrency, args.duration, args.requests)
+        finally:
+            process.terminate()
+            process.wait(timeout=10)
+            for server, _ in servers:
+                server.shutdown()
+
+        report = {
+            "benchmark": "loadtest",
+            "target": target,
+            "revision": revision,
+            "run_at": datetime.now().isoformat(),
+            "config": {
+                "duration": args.duration,
+                "requests": args.requests,
+                "concurrency": args.concurrency,
+                "mix": mix,
+                "language": args.language,
+                "ollama_profile": args.ollama_profile,
+                "ollama_nodes": args.ollama_nodes
+            },
+            "wall_seconds": round(wall, 3),
+            "summary": summarize(samples, wall)
+        }
+
+        output = os.path.join(args.output_dir, f"loadtest-{target}-{revision}.json")
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+        overall = report["summary"]["overall"]
+        print(f"\n{target}: {overall['requests']} requests in {report['wall_seconds']}s, "
+              f"{overall['throughput_rps']} req/s, error rate {overall['error_rate']}")
+        for endpoint, row in report["summary"]["endpoints"].items():
+            print(f"  {endpoint:<22} n={row['requests']:<5} p50 {row['p50_ms']}ms  p95 {row['p95_ms']}ms  "
+                  f"p99 {row['p99_ms']}ms  errors {row['errors']}")
+        print(f"Wrote {output}")
+
+        if args.compare:
+            compare(report, args.compare)
+
+
+if __name__ == "__main__":
+    main()
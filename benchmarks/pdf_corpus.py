@@ -0,0 +1,273 @@
+"""PDF extraction micro-benchmark over a locally cached USCIS form corpus
+
+Two steps, only the first needs the network:
+
+    python benchmarks/pdf_corpus.py fetch [--limit 50] [--include-instructions]
+    python benchmarks/pdf_corpus.py run [--top 10] [--repeat 3]
+
+`fetch` downloads the PDFs listed in uscis_all_forms.json into the corpus directory
+(benchmarks/.corpus by default, or PDF_CORPUS_DIR) and records them in manifest.json.
+`run` reads only the cached files and times api.py's extract_text_from_pdf,
+identify_form_type and chunk_document per form, reporting pages/second and peak
+Python memory (tracemalloc, measured in a separate pass so it does not skew timings).
+Forms carrying an AcroForm or XFA payload are flagged and also timed through
+acroform.extract_acroform, the field-tree path api.py prefers for them. The slowest
+forms are listed.
+"""
+import argparse
+import hashlib
+import io
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, ROOT)
+
+CATALOG = os.path.join(ROOT, "uscis_all_forms.json")
+DEFAULT_CORPUS_DIR = os.getenv("PDF_CORPUS_DIR", os.path.join(BENCH_DIR, ".corpus"))
+
+
+def load_manifest(corpus_dir):
+    path = os.path.join(corpus_dir, "manifest.json")
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_manifest(corpus_dir, manifest):
+    with open(os.path.join(corpus_dir, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+
+
+def fetch(args):
+    import requests
+
+    with open(CATALOG, encoding="utf-8") as f:
+        catalog = json.load(f)
+
+    os.makedirs(args.corpus_dir, exist_ok=True)
+    manifest = load_manifest(args.corpus_dir)
+    session = requests.Session()
+    session.headers["User-Agent"] = "NavigateHome.AI corpus fetcher"
+
+    urls = []
+    for form in catalog:
+        for url in form.get("pdfs", []):
+            if not args.include_instructions and os.path.splitext(url)[0].endswith("instr"):
+                continue
+            urls.append((form["name"], url))
+    if args.limit:
+        urls = urls[:args.limit]
+
+    fetched = skipped = failed = 0
+    for name, url in urls:
+        filename = os.path.basename(url)
+        if filename in manifest and os.path.exists(os.path.join(args.corpus_dir, filename)):
+            skipped += 1
+            continue
+        try:
+            response = session.get(url, timeout=60)
+            response.raise_for_status()
+        except Exception as e:
+            print(f"Error fetching {url}: {e}")
+            failed += 1
+            continue
+        with open(os.path.join(args.corpus_dir, filename), "wb") as f:
+            f.write(response.content)
+        manifest[filename] = {
+            "form": name,
+            "url": url,
+            "bytes": len(response.content),
+            "sha256": hashlib.sha256(response.content).hexdigest(),
+            "fetched_at": datetime.now().isoformat()
+        }
+        fetched += 1
+        save_manifest(args.corpus_dir, manifest)
+
+    save_manifest(args.corpus_dir, manifest)
+    print(f"Fetched {fetched}, already cached {skipped}, failed {failed} -> {args.corpus_dir}")
+
+
+def inspect_pdf(content):
+    """Page count plus whether the document is a fillable AcroForm / XFA form"""
+    import PyPDF2
+
+    reader = PyPDF2.PdfReader(io.BytesIO(content))
+    root = reader.trailer["/Root"]
+    acroform = root.get("/AcroForm")
+    acroform = acroform.get_object() if acroform is not None else None
+    fields = acroform.get("/Fields") if acroform is not None else None
+    return {
+        "pages": len(reader.pages),
+        "acroform": acroform is not None,
+        "xfa": acroform is not None and "/XFA" in acroform,
+        "fields": len(fields.get_object()) if fields is not None else 0
+    }
+
+
+def time_stages(api, content):
+    timings = {}
+    started = time.perf_counter()
+    text = api.extract_text_from_pdf(content)
+    timings["extract"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    api.identify_form_type(text)
+    timings["identify"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    chunks = api.chunk_document(text)
+    timings["chunk"] = time.perf_counter() - started
+    return timings, text, chunks
+
+
+def time_acroform(content, repeat):
+    """Median field-tree extraction time and the questions it finds (fillable forms only)"""
+    import acroform
+
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        form = acroform.extract_acroform(content)
+        timings.append(time.perf_counter() - started)
+    questions = sum(len(section["questions"]) for section in form["sections"]) if form else 0
+    return statistics.median(timings), questions
+
+
+def peak_memory(api, content):
+    tracemalloc.start()
+    try:
+        text = api.extract_text_from_pdf(content)
+        api.chunk_document(text)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, text=True).strip()
+    except Exception:
+        return "unknown"
+
+
+def run(args):
+    os.environ.setdefault("OLLAMA_WARMUP", "0")
+    import api
+
+    manifest = load_manifest(args.corpus_dir)
+    if not manifest:
+        sys.exit(f"No cached corpus in {args.corpus_dir}; run `fetch` first")
+
+    rows = []
+    for filename in sorted(manifest):
+        path = os.path.join(args.corpus_dir, filename)
+        if not os.path.exists(path):
+            continue
+        with open(path, "rb") as f:
+            content = f.read()
+
+        try:
+            info = inspect_pdf(content)
+        except Exception as e:
+            print(f"Skipping unreadable {filename}: {e}")
+            continue
+
+        runs = [time_stages(api, content) for _ in range(args.repeat)]
+        stage_seconds = {
+            stage: statistics.median(timings[stage] for timings, _, _ in runs)
+            for stage in ("extract", "identify", "chunk")
+        }
+        _, text, chunks = runs[-1]
+        total = sum(stage_seconds.values())
+        acroform_seconds, acroform_questions = time_acroform(content, args.repeat) if info["acroform"] else (None, 0)
+
+        rows.append({
+            "file": filename,
+            "form": manifest[filename].get("form"),
+            "bytes": len(content),
+            **info,
+            "text_chars": len(text),
+            "long_essay_questions": len(chunks["long_essay_questions"]),
+            "short_answer_questions": len(chunks["short_answer_questions"]),
+            "stage_ms": {stage: round(seconds * 1000, 2) for stage, seconds in stage_seconds.items()},
+            "total_ms": round(total * 1000, 2),
+            "pages_per_second": round(info["pages"] / stage_seconds["extract"], 1) if stage_seconds["extract"] else None,
+            "ms_per_page": round(total * 1000 / info["pages"], 2) if info["pages"] else None,
+            "acroform_ms": round(acroform_seconds * 1000, 2) if acroform_seconds is not None else None,
+            "acroform_questions": acroform_questions,
+            "peak_memory_kb": round(peak_memory(api, content) / 1024, 1)
+        })
+        print(f"{filename:<28} {info['pages']:>3}p  {rows[-1]['total_ms']:>9.1f}ms  "
+              f"{rows[-1]['pages_per_second'] or 0:>7.1f} p/s  {rows[-1]['peak_memory_kb']:>9.1f}KB"
+              f"{'  XFA' if info['xfa'] else '  AcroForm' if info['acroform'] else ''}")
+
+    worst = sorted(rows, key=lambda row: row["total_ms"], reverse=True)[:args.top]
+    fillable = [row for row in rows if row["acroform"]]
+    report = {
+        "benchmark": "pdf_corpus",
+        "revision": git_revision(),
+        "run_at": datetime.now().isoformat(),
+        "repeat": args.repeat,
+        "forms": len(rows),
+        "totals": {
+            "pages": sum(row["pages"] for row in rows),
+            "seconds": round(sum(row["total_ms"] for row in rows) / 1000, 3),
+            "fillable_forms": len(fillable),
+            "xfa_forms": sum(1 for row in rows if row["xfa"]),
+            "median_ms_per_page_fillable": statistics.median(row["ms_per_page"] for row in fillable) if fillable else None,
+            "median_acroform_ms_per_page": statistics.median(
+                row["acroform_ms"] / row["pages"] for row in fillable if row["pages"]
+            ) if fillable else None,
+            "median_ms_per_page_flat": statistics.median(
+                row["ms_per_page"] for row in rows if not row["acroform"]
+            ) if len(fillable) < len(rows) else None
+        },
+        "worst_offenders": [
+            {key: row[key] for key in ("file", "pages", "total_ms", "ms_per_page", "peak_memory_kb", "acroform", "xfa", "fields")}
+            for row in worst
+        ],
+        "forms_detail": rows
+    }
+
+    os.makedirs(os.path.dirname(args.output), exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    print(f"\nWorst {len(worst)} by total time:")
+    for row in report["worst_offenders"]:
+        kind = "XFA" if row["xfa"] else "AcroForm" if row["acroform"] else "flat"
+        print(f"  {row['file']:<28} {row['total_ms']:>9.1f}ms  {row['ms_per_page']:>7.1f}ms/page  {kind} ({row['fields']} fields)")
+    print(f"Wrote {args.output}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus-dir", default=DEFAULT_CORPUS_DIR)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    fetch_parser = commands.add_parser("fetch", help="download the corpus (network)")
+    fetch_parser.add_argument("--limit", type=int, default=0)
+    fetch_parser.add_argument("--include-instructions", action="store_true", help="also fetch the *instr.pdf files")
+    fetch_parser.set_defaults(handler=fetch)
+
+    run_parser = commands.add_parser("run", help="benchmark the cached corpus (offline)")
+    run_parser.add_argument("--repeat", type=int, default=3, help="timed passes per form, median is reported")
+    run_parser.add_argument("--top", type=int, default=10, help="worst offenders to list")
+    run_parser.add_argument("--output", default=os.path.join(BENCH_DIR, "results", "pdf_corpus.json"))
+    run_parser.set_defaults(handler=run)
+
+    args = parser.parse_args()
+    args.handler(args)
+
+
+if __name__ == "__main__":
+    main()
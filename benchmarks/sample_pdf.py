@@ -0,0 +1,99 @@
+"""Build small PDFs (text, optionally fillable fields) for benchmarks without any PDF-writing dependency"""
+
+SAMPLE_LINES = [
+    "Form I-485 Application to Register Permanent Residence or Adjust Status",
+    "Part 1. Information About You",
+    "Provide your full legal name as it appears on your birth certificate.",
+    "What is your date of birth and your country of citizenship?",
+    "Describe in detail your immigration history, including all entries into the United States, dates of entry, ports of entry, and immigration status at each entry.",
+    "Provide a complete account of your criminal history, including all arrests, charges, convictions, and any interactions with law enforcement agencies.",
+    "Explain the circumstances that led to your current immigration status and provide detailed documentation supporting your eligibility for adjustment of status.",
+    "List your current mailing address and the address where you physically live.",
+    "Have you ever been denied a visa or refused admission to the United States?",
+]
+
+
+def _escape(text):
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def build_pdf(pages, fields=None):
+    """Build a PDF where each page is a list of text lines
+
+    `fields`, one list per page of (name, label, multiline) tuples, adds fillable
+    AcroForm text fields to the pages.
+    """
+    objects = []
+
+    def add(body):
+        objects.append(body)
+        return len(objects)
+
+    font = add(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+    pages_id = add(b"")  # filled in once the page ids are known
+    page_ids = []
+    field_ids = []
+    for index, lines in enumerate(pages):
+        stream = "BT /F1 10 Tf 50 750 Td 14 TL\n"
+        stream += "".join(f"({_escape(line)}) Tj T*\n" for line in lines)
+        stream += "ET"
+        data = stream.encode("latin-1")
+        content = add(b"<< /Length %d >>\nstream\n" % len(data) + data + b"\nendstream")
+        page_id = add(b"")  # filled in once its widgets exist
+        annotations = []
+        for row, (name, label, multiline) in enumerate((fields or [[]] * len(pages))[index]):
+            top = 740 - row * 30
+            annotations.append(add(
+                b"<< /Type /Annot /Subtype /Widget /FT /Tx /T (%s) /TU (%s) /Ff %d /Rect [50 %d 560 %d] /P %d 0 R >>"
+                % (_escape(name).encode(), _escape(label).encode(), 4096 if multiline else 0, top - 24, top, page_id)
+            ))
+        field_ids.extend(annotations)
+        annots = b" /Annots [%s]" % " ".join(f"{a} 0 R" for a in annotations).encode() if annotations else b""
+        objects[page_id - 1] = (
+            b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 612 792] /Contents %d 0 R "
+            b"/Resources << /Font << /F1 %d 0 R >> >>%s >>" % (pages_id, content, font, annots)
+        )
+        page_ids.append(page_id)
+    kids = " ".join(f"{page_id} 0 R" for page_id in page_ids).encode()
+    objects[pages_id - 1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, len(page_ids))
+    acroform = b""
+    if field_ids:
+        acroform = b" /AcroForm << /Fields [%s] >>" % " ".join(f"{f} 0 R" for f in field_ids).encode()
+    catalog = add(b"<< /Type /Catalog /Pages %d 0 R%s >>" % (pages_id, acroform))
+
+    output = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(output))
+        output += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(output)
+    output += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        output += b"%010d 00000 n \n" % offset
+    output += b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, catalog, xref)
+    return bytes(output)
+
+
+def sample_form_pdf(page_count=2):
+    """A small I-485 style PDF repeating SAMPLE_LINES on every page"""
+    return build_pdf([SAMPLE_LINES for _ in range(page_count)])
+
+
+SAMPLE_FIELDS = [
+    ("Pt1Line1a_FamilyName", "Part 1. Information About You. 1.a. Family Name (Last Name).", False),
+    ("Pt1Line2_DateOfBirth", "Part 1. Information About You. 2. Date of Birth (mm/dd/yyyy).", False),
+    ("Pt2Line1_History", "Part 2. Immigration History. 1. Describe in detail your immigration history, including all entries into the United States.", True),
+    ("Pt2Line2_Criminal", "Part 2. Immigration History. 2. Provide a complete account of your criminal history, including all arrests.", True),
+]
+
+
+def sample_fillable_pdf(page_count=2):
+    """sample_form_pdf with SAMPLE_FIELDS as fillable fields on every page"""
+    return build_pdf(
+        [SAMPLE_LINES for _ in range(page_count)],
+        [[(f"{name}_{page}", label, multiline) for name, label, multiline in SAMPLE_FIELDS] for page in range(page_count)]
+    )
+
+
+def sample_form_text():
+    return "\n".join(SAMPLE_LINES)
@@ -0,0 +1,140 @@
+"""Cold-start benchmark: import time breakdown and time to first successful request
+
+For each target module this measures, in fresh interpreters:
+
+- import wall time (median of --repeat runs)
+- the heaviest modules from `python -X importtime`, by cumulative time
+- time from spawning uvicorn to the first 200 from /health/live, and to the first
+  200 from a real endpoint (/forms)
+
+    python benchmarks/startup.py --target api api_v2 --repeat 5
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+import requests
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(BENCH_DIR)
+
+# Point at a closed port so warm-up and readiness never wait on a real model
+ENV = dict(os.environ, OLLAMA_BASE_URLS="http://127.0.0.1:9", OLLAMA_WARMUP="0", OLLAMA_KEEPALIVE_INTERVAL="0")
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def import_seconds(module):
+    code = f"import time; started = time.perf_counter(); import {module}; print(time.perf_counter() - started)"
+    output = subprocess.check_output([sys.executable, "-c", code], cwd=ROOT, env=ENV, text=True)
+    return float(output.strip().splitlines()[-1])
+
+
+def importtime_lines(code):
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT, env=ENV, capture_output=True, text=True, check=True
+    )
+    return result.stderr.splitlines()
+
+
+def import_breakdown(module, top):
+    # Modules the bare interpreter already imports (site, .pth hooks) are not ours
+    baseline = {line.split("|")[-1].strip() for line in importtime_lines("pass") if line.startswith("import time:")}
+    rows = []
+    for line in importtime_lines(f"import {module}"):
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_part, cumulative_part, name = line.split("|", 2)
+        self_us = int(self_part.split(":")[1])
+        cumulative_us = int(cumulative_part)
+        depth = (len(name) - len(name.lstrip())) // 2
+        if name.strip() in baseline:
+            continue
+        rows.append({"module": name.strip(), "depth": depth, "self_ms": self_us / 1000, "cumulative_ms": cumulative_us / 1000})
+    # Direct imports of the target (depth 1) show which dependencies it pulls in eagerly
+    direct = sorted((row for row in rows if row["depth"] == 1), key=lambda row: row["cumulative_ms"], reverse=True)
+    return [
+        {"module": row["module"], "cumulative_ms": round(row["cumulative_ms"], 1), "self_ms": round(row["self_ms"], 1)}
+        for row in direct[:top]
+    ]
+
+
+def time_to_first_request(module):
+    port = free_port()
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", f"{module}:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=ROOT, env=ENV
+    )
+    live = first_request = None
+    try:
+        deadline = started + 60
+        while time.perf_counter() < deadline and first_request is None:
+            try:
+                if live is None and requests.get(f"http://127.0.0.1:{port}/health/live", timeout=1).ok:
+                    live = time.perf_counter() - started
+                if live is not None and requests.get(f"http://127.0.0.1:{port}/forms", timeout=5).ok:
+                    first_request = time.perf_counter() - started
+            except requests.RequestException:
+                time.sleep(0.01)
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+    return live, first_request
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, text=True).strip()
+    except Exception:
+        return "unknown"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target", nargs="+", default=["api", "api_v2"])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10, help="direct imports to list in the breakdown")
+    parser.add_argument("--output", default=os.path.join(BENCH_DIR, "results", "startup.json"))
+    args = parser.parse_args()
+
+    report = {"benchmark": "startup", "revision": git_revision(), "run_at": datetime.now().isoformat(), "targets": {}}
+    for target in args.target:
+        imports = [import_seconds(target) for _ in range(args.repeat)]
+        starts = [time_to_first_request(target) for _ in range(args.repeat)]
+        live = [value for value, _ in starts if value is not None]
+        ready = [value for _, value in starts if value is not None]
+        report["targets"][target] = {
+            "import_ms_median": round(statistics.median(imports) * 1000, 1),
+            "import_ms_min": round(min(imports) * 1000, 1),
+            "time_to_live_ms_median": round(statistics.median(live) * 1000, 1) if live else None,
+            "time_to_first_request_ms_median": round(statistics.median(ready) * 1000, 1) if ready else None,
+            "failed_starts": len(starts) - len(ready),
+            "heaviest_direct_imports": import_breakdown(target, args.top)
+        }
+
+        row = report["targets"][target]
+        print(f"{target}: import {row['import_ms_median']}ms, live after {row['time_to_live_ms_median']}ms, "
+              f"first /forms after {row['time_to_first_request_ms_median']}ms")
+        for entry in row["heaviest_direct_imports"]:
+            print(f"    {entry['module']:<24} {entry['cumulative_ms']:>8.1f}ms")
+
+    os.makedirs(os.path.dirname(args.output), exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
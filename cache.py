@@ -0,0 +1,181 @@
+"""Result caches shared by the request handlers
+
+Two backends with the same get/set interface:
+
+- MemoryCache: per-process LRU with TTL, the default for a single worker
+- SQLiteCache: a local SQLite file in WAL mode, so every worker process on the
+  host reads and writes the same entries (CACHE_BACKEND=sqlite)
+
+Values are stored as JSON.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from metrics import REGISTRY
+
+CACHE_LOOKUPS = REGISTRY.counter(
+    "cache_lookups_total",
+    "Cache lookups by cache name and result (hit/miss)"
+)
+
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memory")
+CACHE_PATH = os.getenv("CACHE_PATH", os.path.join(os.getenv("TMPDIR", "/tmp"), "navigatehome-cache.sqlite3"))
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "10000"))
+
+
+class MemoryCache:
+    """Thread-safe LRU cache with a per-entry TTL"""
+
+    def __init__(self, name: str, max_entries: int = CACHE_MAX_ENTRIES, ttl: Optional[float] = None):
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and (entry[1] is None or entry[1] > time.time()):
+                self._entries.move_to_end(key)
+                self.hits += 1
+                CACHE_LOOKUPS.inc(cache=self.name, result="hit")
+                return json.loads(entry[0])
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            CACHE_LOOKUPS.inc(cache=self.name, result="miss")
+            return None
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        ttl = ttl if ttl is not None else self.ttl
+        expires_at = time.time() + ttl if ttl else None
+        with self._lock:
+            self._entries[key] = (json.dumps(value), expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "backend": "memory",
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 3) if lookups else None
+        }
+
+
+class SQLiteCache:
+    """Cache shared between worker processes through one SQLite file
+
+    Connections are opened lazily per thread and per process, so a cache created
+    before the server forks its workers is safe to use in every worker.
+    """
+
+    def __init__(self, name: str, path: str = CACHE_PATH, max_entries: int = CACHE_MAX_ENTRIES, ttl: Optional[float] = None):
+        self.name = name
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._local = threading.local()
+        self.hits = 0
+        self.misses = 0
+        self._writes = 0
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None or getattr(self._local, "pid", None) != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                "namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, "
+                "expires_at REAL, stored_at REAL NOT NULL, PRIMARY KEY (namespace, key))"
+            )
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return connection
+
+    def get(self, key: str) -> Optional[Any]:
+        try:
+            row = self._connection().execute(
+                "SELECT value, expires_at FROM cache WHERE namespace = ? AND key = ?", (self.name, key)
+            ).fetchone()
+        except sqlite3.Error as e:
+            print(f"Error reading {self.name} cache: {e}")
+            row = None
+
+        if row is not None and (row[1] is None or row[1] > time.time()):
+            self.hits += 1
+            CACHE_LOOKUPS.inc(cache=self.name, result="hit")
+            return json.loads(row[0])
+        self.misses += 1
+        CACHE_LOOKUPS.inc(cache=self.name, result="miss")
+        return None
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        ttl = ttl if ttl is not None else self.ttl
+        now = time.time()
+        try:
+            connection = self._connection()
+            connection.execute(
+                "INSERT OR REPLACE INTO cache (namespace, key, value, expires_at, stored_at) VALUES (?, ?, ?, ?, ?)",
+                (self.name, key, json.dumps(value), now + ttl if ttl else None, now)
+            )
+            self._writes += 1
+            if self._writes % 500 == 0:
+                self.prune()
+        except sqlite3.Error as e:
+            print(f"Error writing {self.name} cache: {e}")
+
+    def delete(self, key: str):
+        try:
+            self._connection().execute("DELETE FROM cache WHERE namespace = ? AND key = ?", (self.name, key))
+        except sqlite3.Error as e:
+            print(f"Error deleting from {self.name} cache: {e}")
+
+    def prune(self):
+        """Drop expired entries, then the oldest ones beyond max_entries"""
+        connection = self._connection()
+        connection.execute("DELETE FROM cache WHERE namespace = ? AND expires_at IS NOT NULL AND expires_at < ?", (self.name, time.time()))
+        connection.execute(
+            "DELETE FROM cache WHERE namespace = ? AND key NOT IN ("
+            "SELECT key FROM cache WHERE namespace = ? ORDER BY stored_at DESC LIMIT ?)",
+            (self.name, self.name, self.max_entries)
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        try:
+            entries = self._connection().execute("SELECT COUNT(*) FROM cache WHERE namespace = ?", (self.name,)).fetchone()[0]
+        except sqlite3.Error:
+            entries = None
+        lookups = self.hits + self.misses
+        return {
+            "backend": "sqlite",
+            "path": self.path,
+            "entries": entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 3) if lookups else None
+        }
+
+
+def create_cache(name: str, ttl: Optional[float] = None, max_entries: int = CACHE_MAX_ENTRIES):
+    """Build a cache on the configured backend (CACHE_BACKEND=memory|sqlite)"""
+    if CACHE_BACKEND == "sqlite":
+        return SQLiteCache(name, ttl=ttl, max_entries=max_entries)
+    return MemoryCache(name, ttl=ttl, max_entries=max_entries)
@@ -0,0 +1,75 @@
+"""Split long documents into translation-sized chunks that reassemble exactly
+
+The document is cut into paragraphs (separated by blank lines); a paragraph over
+the token budget is cut between sentences, a sentence between words, and a word
+longer than the budget into fixed-size slices. Consecutive pieces are then packed
+into chunks of up to the budget, so short paragraphs share a chunk (with their
+blank lines inside it). Each chunk keeps the whitespace that followed it so
+joining `text + separator` over all chunks reproduces the input.
+"""
+import re
+from typing import List, Tuple
+
+# Rough English average; good enough to stay well inside the context window
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def _split_keeping_separators(text: str, pattern: str) -> List[Tuple[str, str]]:
+    parts = re.split(f"({pattern})", text)
+    # re.split with a capture group alternates piece, separator, piece, ...
+    return [(parts[i], parts[i + 1] if i + 1 < len(parts) else "") for i in range(0, len(parts), 2)]
+
+
+def _pack(pieces: List[Tuple[str, str]], max_tokens: int) -> List[Tuple[str, str]]:
+    """Greedily merge consecutive pieces while the merged text stays within budget"""
+    packed: List[Tuple[str, str]] = []
+    for text, separator in pieces:
+        if packed:
+            merged = packed[-1][0] + packed[-1][1] + text
+            if estimate_tokens(merged) <= max_tokens:
+                packed[-1] = (merged, separator)
+                continue
+        packed.append((text, separator))
+    return packed
+
+
+def _split_word(word: str, separator: str, max_tokens: int) -> List[Tuple[str, str]]:
+    """Cut a word longer than the budget (URLs, base64, runs without spaces) into slices"""
+    width = max_tokens * CHARS_PER_TOKEN
+    if len(word) <= width:
+        return [(word, separator)]
+    slices = [word[start:start + width] for start in range(0, len(word), width)]
+    return [(piece, "") for piece in slices[:-1]] + [(slices[-1], separator)]
+
+
+def _split_oversized(text: str, max_tokens: int) -> List[Tuple[str, str]]:
+    if estimate_tokens(text) <= max_tokens:
+        return [(text, "")]
+    pieces: List[Tuple[str, str]] = []
+    for sentence, separator in _split_keeping_separators(text, r"(?<=[.!?])\s+"):
+        if estimate_tokens(sentence) <= max_tokens:
+            pieces.append((sentence, separator))
+            continue
+        words = _split_keeping_separators(sentence, r"\s+")
+        words[-1] = (words[-1][0], separator)
+        for word, word_separator in words:
+            pieces.extend(_split_word(word, word_separator, max_tokens))
+    return pieces
+
+
+def split_for_translation(text: str, max_tokens: int = 400) -> List[Tuple[str, str]]:
+    """(chunk, following whitespace) pairs in document order"""
+    pieces: List[Tuple[str, str]] = []
+    for paragraph, separator in _split_keeping_separators(text, r"\n\s*\n"):
+        paragraph_pieces = _split_oversized(paragraph, max_tokens)
+        paragraph_pieces[-1] = (paragraph_pieces[-1][0], paragraph_pieces[-1][1] + separator)
+        pieces.extend(paragraph_pieces)
+    return [chunk for chunk in _pack(pieces, max_tokens) if chunk[0] or chunk[1]]
+
+
+def reassemble(chunks: List[Tuple[str, str]]) -> str:
+    return "".join(text + separator for text, separator in chunks)
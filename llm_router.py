@@ -0,0 +1,253 @@
+"""Health-aware load balancing across one or more Ollama backends"""
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+
+def load_backend_urls(default: str = "http://localhost:11434") -> List[str]:
+    """Read backend URLs from OLLAMA_BASE_URLS (comma separated) or OLLAMA_BASE_URL"""
+    raw = os.getenv("OLLAMA_BASE_URLS") or os.getenv("OLLAMA_BASE_URL") or default
+    urls = [url.strip().rstrip("/") for url in raw.split(",") if url.strip()]
+    return urls or [default]
+
+
+class NoHealthyBackendError(Exception):
+    """Raised when every backend is ejected or every attempt failed"""
+
+
+class BackendRequestError(Exception):
+    """A 4xx from a backend: the request itself is wrong (unknown model, bad options)
+
+    Another node would answer the same way, so it is neither retried nor counted
+    against the backend's health.
+    """
+
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(f"{status_code}: {detail}")
+        self.status_code = status_code
+        self.detail = detail
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker (closed -> open -> half-open)"""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 3, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self.trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return self.CLOSED
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    def allow_request(self) -> bool:
+        """Closed lets everything through, half-open lets a single trial call through"""
+        state = self.state
+        if state == self.CLOSED:
+            return True
+        if state == self.HALF_OPEN and not self.trial_in_flight:
+            return True
+        return False
+
+    def on_dispatch(self):
+        if self.state == self.HALF_OPEN:
+            self.trial_in_flight = True
+
+    def record_success(self):
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self.trial_in_flight = False
+
+    def record_failure(self):
+        self.consecutive_failures += 1
+        if self.trial_in_flight or self.consecutive_failures >= self.failure_threshold:
+            # A failed half-open trial re-opens the breaker for another full cooldown
+            self.opened_at = time.monotonic()
+        self.trial_in_flight = False
+
+
+class OllamaBackend:
+    """One Ollama node with its load and latency bookkeeping"""
+
+    def __init__(self, base_url: str, breaker: CircuitBreaker, ewma_alpha: float = 0.3):
+        self.base_url = base_url
+        self.breaker = breaker
+        self.ewma_alpha = ewma_alpha
+        self.outstanding = 0
+        self.ewma_latency: Optional[float] = None
+        self.total_requests = 0
+        self.total_failures = 0
+
+    def observe_latency(self, seconds: float):
+        if self.ewma_latency is None:
+            self.ewma_latency = seconds
+        else:
+            self.ewma_latency = self.ewma_alpha * seconds + (1 - self.ewma_alpha) * self.ewma_latency
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "url": self.base_url,
+            "state": self.breaker.state,
+            "outstanding": self.outstanding,
+            "ewma_latency_ms": round(self.ewma_latency * 1000, 1) if self.ewma_latency is not None else None,
+            "total_requests": self.total_requests,
+            "total_failures": self.total_failures
+        }
+
+
+class OllamaRouter:
+    """Route Ollama calls to the least loaded healthy backend, retrying elsewhere on failure"""
+
+    def __init__(
+        self,
+        base_urls: List[str],
+        timeout: float = 30.0,
+        max_attempts: Optional[int] = None,
+        failure_threshold: int = 3,
+        reset_timeout: float = 30.0
+    ):
+        if not base_urls:
+            raise ValueError("At least one Ollama backend URL is required")
+        self.timeout = timeout
+        self.backends = [
+            OllamaBackend(url.rstrip("/"), CircuitBreaker(failure_threshold, reset_timeout))
+            for url in base_urls
+        ]
+        self.max_attempts = max_attempts or len(self.backends)
+        self._lock = threading.Lock()
+        self._http = None
+
+    @property
+    def _session(self):
+        """HTTP session created on first use, keeping `requests` out of import time"""
+        if self._http is None:
+            import requests
+
+            with self._lock:
+                if self._http is None:
+                    self._http = requests.Session()
+        return self._http
+
+    def _acquire(self, exclude: List[OllamaBackend]) -> Optional[OllamaBackend]:
+        """Pick by fewest outstanding requests, then lowest EWMA latency"""
+        with self._lock:
+            candidates = [
+                backend for backend in self.backends
+                if backend not in exclude and backend.breaker.allow_request()
+            ]
+            if not candidates:
+                return None
+            # Backends with no latency sample yet sort first so they get probed
+            backend = min(
+                candidates,
+                key=lambda b: (b.outstanding, b.ewma_latency if b.ewma_latency is not None else 0.0)
+            )
+            backend.breaker.on_dispatch()
+            backend.outstanding += 1
+            backend.total_requests += 1
+            return backend
+
+    def _release(self, backend: OllamaBackend, elapsed: Optional[float], ok: bool):
+        """Return a backend; elapsed None skips the latency sample (e.g. a fast 4xx)"""
+        with self._lock:
+            backend.outstanding -= 1
+            if ok:
+                if elapsed is not None:
+                    backend.observe_latency(elapsed)
+                backend.breaker.record_success()
+            else:
+                backend.total_failures += 1
+                backend.breaker.record_failure()
+
+    def request(self, method: str, path: str, payload: Optional[Dict] = None, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Send a JSON request to a healthy backend and return the decoded response"""
+        tried: List[OllamaBackend] = []
+        last_error: Optional[Exception] = None
+
+        for _ in range(self.max_attempts):
+            backend = self._acquire(tried)
+            if backend is None:
+                break
+            tried.append(backend)
+
+            started = time.perf_counter()
+            try:
+                response = self._session.request(
+                    method, f"{backend.base_url}{path}", json=payload, timeout=timeout or self.timeout
+                )
+                if 400 <= response.status_code < 500:
+                    # The node answered, so it is healthy; the caller has to fix the request
+                    self._release(backend, None, ok=True)
+                    raise BackendRequestError(response.status_code, response.text[:500])
+                response.raise_for_status()
+                result = response.json()
+            except BackendRequestError:
+                raise
+            except Exception as e:
+                self._release(backend, time.perf_counter() - started, ok=False)
+                print(f"Ollama backend {backend.base_url} failed: {e}")
+                last_error = e
+                continue
+
+            self._release(backend, time.perf_counter() - started, ok=True)
+            return result
+
+        if last_error is not None:
+            raise NoHealthyBackendError(f"All Ollama attempts failed, last error: {last_error}")
+        raise NoHealthyBackendError("No healthy Ollama backend available")
+
+    def post(self, path: str, payload: Dict, timeout: Optional[float] = None) -> Dict[str, Any]:
+        return self.request("POST", path, payload, timeout)
+
+    def get(self, path: str, timeout: Optional[float] = None) -> Dict[str, Any]:
+        return self.request("GET", path, None, timeout)
+
+    def _call_backend(self, backend: OllamaBackend, method: str, path: str, payload: Optional[Dict], timeout: float) -> Dict[str, Any]:
+        started = time.perf_counter()
+        try:
+            response = self._session.request(method, f"{backend.base_url}{path}", json=payload, timeout=timeout)
+            response.raise_for_status()
+            result = {"url": backend.base_url, "ok": True, "data": response.json()}
+        except Exception as e:
+            result = {"url": backend.base_url, "ok": False, "error": str(e)}
+        result["latency_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        return result
+
+    def _each_backend(self, method: str, path: str, payload: Optional[Dict], timeout: float) -> List[Dict[str, Any]]:
+        """Call every backend in parallel, so unreachable nodes cost one timeout rather than one each"""
+        if len(self.backends) == 1:
+            return [self._call_backend(self.backends[0], method, path, payload, timeout)]
+        with ThreadPoolExecutor(max_workers=len(self.backends)) as pool:
+            return list(pool.map(lambda backend: self._call_backend(backend, method, path, payload, timeout), self.backends))
+
+    def probe(self, path: str, timeout: float = 2.0) -> List[Dict[str, Any]]:
+        """GET a cheap endpoint on every backend without touching load or breaker state"""
+        return self._each_backend("GET", path, None, timeout)
+
+    def broadcast(self, path: str, payload: Dict, timeout: Optional[float] = None) -> List[Dict[str, Any]]:
+        """POST the same payload to every backend, e.g. to load a model on all nodes"""
+        return self._each_backend("POST", path, payload, timeout or self.timeout)
+
+    def in_flight(self) -> int:
+        return sum(backend.outstanding for backend in self.backends)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            backends = [backend.stats() for backend in self.backends]
+        return {
+            "backends": backends,
+            "healthy_backends": sum(1 for b in backends if b["state"] != CircuitBreaker.OPEN),
+            "in_flight": sum(b["outstanding"] for b in backends)
+        }
@@ -0,0 +1,121 @@
+"""Opt-in sampling profiler producing flamegraph-compatible collapsed stacks
+
+Nothing runs until a profile is requested: no thread, no hooks, no per-request work
+beyond a header lookup. While active, a daemon thread wakes every `interval` seconds,
+snapshots the target threads' stacks with sys._current_frames() and counts each
+stack. The output is Brendan Gregg's collapsed format (`frame;frame;frame count`),
+readable by flamegraph.pl, speedscope and inferno.
+"""
+import hmac
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict
+from typing import Dict, Iterable, Optional, Set
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    filename = code.co_filename.rsplit("/", 1)[-1]
+    return f"{code.co_name} ({filename}:{frame.f_lineno})"
+
+
+def collapse_stack(frame) -> str:
+    frames = []
+    while frame is not None:
+        frames.append(_frame_label(frame))
+        frame = frame.f_back
+    return ";".join(reversed(frames))
+
+
+class SamplingProfiler:
+    """Sample thread stacks on a background thread until stopped"""
+
+    def __init__(self, interval: float = 0.005, thread_ids: Optional[Iterable[int]] = None):
+        self.interval = interval
+        self.thread_ids: Optional[Set[int]] = set(thread_ids) if thread_ids is not None else None
+        self.samples: Counter = Counter()
+        self.sample_count = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.started_at: Optional[float] = None
+        self.stopped_at: Optional[float] = None
+
+    def _run(self):
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                if self.thread_ids is not None and thread_id not in self.thread_ids:
+                    continue
+                self.samples[collapse_stack(frame)] += 1
+            self.sample_count += 1
+
+    def start(self) -> "SamplingProfiler":
+        self.started_at = time.time()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> "SamplingProfiler":
+        if self.stopped_at is not None:
+            return self
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.stopped_at = time.time()
+        return self
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.most_common())
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            "interval_ms": self.interval * 1000,
+            "ticks": self.sample_count,
+            "unique_stacks": len(self.samples),
+            "duration_s": round((self.stopped_at or time.time()) - (self.started_at or time.time()), 3)
+        }
+
+
+# Only one worker-wide profile may run at a time
+_active_lock = threading.Lock()
+
+
+def profile_for(seconds: float, interval: float = 0.005) -> SamplingProfiler:
+    """Sample every thread in the process for `seconds`, blocking the caller"""
+    if not _active_lock.acquire(blocking=False):
+        raise RuntimeError("A profile is already running on this worker")
+    try:
+        profiler = SamplingProfiler(interval).start()
+        time.sleep(seconds)
+        return profiler.stop()
+    finally:
+        _active_lock.release()
+
+
+# Per-request profiles are kept in a small ring so the output can be fetched afterwards
+MAX_STORED_PROFILES = 20
+_stored_profiles: "OrderedDict[str, SamplingProfiler]" = OrderedDict()
+_stored_lock = threading.Lock()
+
+
+def store_profile(profiler: SamplingProfiler) -> str:
+    profile_id = uuid.uuid4().hex[:12]
+    with _stored_lock:
+        _stored_profiles[profile_id] = profiler
+        while len(_stored_profiles) > MAX_STORED_PROFILES:
+            _stored_profiles.popitem(last=False)
+    return profile_id
+
+
+def get_profile(profile_id: str) -> Optional[SamplingProfiler]:
+    with _stored_lock:
+        return _stored_profiles.get(profile_id)
+
+
+def token_matches(expected: str, provided: Optional[str]) -> bool:
+    """Constant-time admin token check; an empty expected token disables access entirely"""
+    return bool(expected) and provided is not None and hmac.compare_digest(expected, provided)
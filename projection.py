@@ -0,0 +1,74 @@
+"""Field projection, language filtering and cursor pagination for dataset endpoints
+
+The datasets are static, so every distinct (projection, languages, page) response is
+serialized once and kept as bytes; repeat requests skip both the filtering and the
+JSON encoding. Query parameters are normalized (sorted and de-duplicated lists, a
+decoded cursor offset, a clamped page size) before they become a cache key so
+equivalent requests share an entry.
+"""
+import base64
+import json
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+
+def parse_list(value: Optional[str], allowed: Iterable[str], name: str) -> Optional[Tuple[str, ...]]:
+    """Comma separated query parameter -> sorted tuple; None when absent. Raises ValueError on unknown values"""
+    if value is None or not value.strip():
+        return None
+    items = {item.strip() for item in value.split(",") if item.strip()}
+    unknown = items - set(allowed)
+    if unknown:
+        raise ValueError(f"Unknown {name}: {', '.join(sorted(unknown))}")
+    return tuple(sorted(items))
+
+
+def project(item: Dict[str, Any], fields: Optional[Sequence[str]]) -> Dict[str, Any]:
+    if fields is None:
+        return item
+    return {field: item[field] for field in fields if field in item}
+
+
+def encode_cursor(offset: int) -> str:
+    return base64.urlsafe_b64encode(json.dumps({"o": offset}).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str]) -> int:
+    if not cursor:
+        return 0
+    try:
+        offset = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))["o"]
+    except Exception:
+        raise ValueError("Invalid cursor")
+    if not isinstance(offset, int) or isinstance(offset, bool) or offset < 0:
+        raise ValueError("Invalid cursor")
+    return offset
+
+
+def page_bounds(cursor: Optional[str], limit: Optional[int]) -> Tuple[int, Optional[int]]:
+    """Normalized (offset, page size) for a request; page size None means unpaged
+
+    Done before the cache lookup so equivalent requests (padded cursors, oversized
+    limits) share one entry. Raises ValueError on a bad cursor.
+    """
+    offset = decode_cursor(cursor)
+    if limit is None and not cursor:
+        return 0, None
+    return offset, max(1, min(limit or DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE))
+
+
+def paginate(items: List[Any], offset: int, limit: Optional[int]) -> Tuple[List[Any], Optional[str]]:
+    """One page of items and the cursor of the next page (None on the last page)
+
+    Without a page size the whole list is returned, as before pagination existed.
+    """
+    if limit is None:
+        return items, None
+    end = offset + limit
+    return items[offset:end], encode_cursor(end) if end < len(items) else None
+
+
+def serialize(body: Dict[str, Any]) -> bytes:
+    return json.dumps(body, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
@@ -0,0 +1,250 @@
+"""Per-client rate limiting weighted by estimated LLM cost
+
+Every client has a token bucket of RATE_LIMIT_CAPACITY cost units that refills at
+RATE_LIMIT_REFILL_PER_SECOND. One unit is roughly one Ollama generation, so an
+/analyze-document call that fans out into 20 generations takes 20 units while a
+chat message takes 2. The estimated cost is taken in middleware before the body is
+read, so a rejected request never reaches a worker thread. A handler that learns
+the real cost later (questions answered from precomputed data cost nothing) calls
+`settle` to refund or charge the difference.
+
+Clients are identified by a known API key (X-API-Key, listed in RATE_LIMIT_API_KEYS),
+otherwise by IP address; X-Forwarded-For is only trusted with
+RATE_LIMIT_TRUST_FORWARDED=1, i.e. behind a proxy that sets it.
+
+Two backends, picked like cache.py's:
+
+- MemoryBuckets: per process; with N workers a client gets up to N times the limit
+- SQLiteBuckets: one table next to the SQLite cache (CACHE_PATH), shared by every
+  worker on the host (RATE_LIMIT_BACKEND=sqlite)
+"""
+import contextvars
+import math
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+
+from fastapi.responses import JSONResponse
+
+from cache import CACHE_BACKEND, CACHE_PATH
+from metrics import REGISTRY
+
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "1") != "0"
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", CACHE_BACKEND)
+# Burst size and sustained rate in cost units (about one Ollama generation each)
+RATE_LIMIT_CAPACITY = float(os.getenv("RATE_LIMIT_CAPACITY", "120"))
+RATE_LIMIT_REFILL_PER_SECOND = float(os.getenv("RATE_LIMIT_REFILL_PER_SECOND", "1"))
+RATE_LIMIT_MAX_CLIENTS = int(os.getenv("RATE_LIMIT_MAX_CLIENTS", "100000"))
+RATE_LIMIT_API_KEYS = {key.strip() for key in os.getenv("RATE_LIMIT_API_KEYS", "").split(",") if key.strip()}
+RATE_LIMIT_TRUST_FORWARDED = os.getenv("RATE_LIMIT_TRUST_FORWARDED", "0") == "1"
+
+RATE_LIMIT_REJECTIONS = REGISTRY.counter(
+    "rate_limit_rejections_total",
+    "Requests rejected with 429 by endpoint"
+)
+RATE_LIMIT_COST = REGISTRY.counter(
+    "rate_limit_cost_units_total",
+    "Estimated LLM cost units taken from client buckets by endpoint"
+)
+
+# The charge of the request being handled, used by settle(). A mutable dict, because a
+# streaming response runs each step in a fresh copy of the request's context
+_current_charge: contextvars.ContextVar = contextvars.ContextVar("rate_limit_charge", default=None)
+
+
+class MemoryBuckets:
+    """Token buckets in a per-process LRU; evicting an idle client just gives it a full bucket"""
+
+    def __init__(self, capacity: float = RATE_LIMIT_CAPACITY, rate: float = RATE_LIMIT_REFILL_PER_SECOND,
+                 max_clients: int = RATE_LIMIT_MAX_CLIENTS):
+        self.capacity = capacity
+        self.rate = rate
+        self.max_clients = max_clients
+        self._buckets: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, client: str, cost: float) -> float:
+        """Take `cost` units; returns 0 when allowed, else the seconds until they will be available"""
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated_at = self._buckets.get(client, (self.capacity, now))
+            tokens = min(self.capacity, tokens + (now - updated_at) * self.rate)
+            if tokens < cost:
+                return (cost - tokens) / self.rate
+            self._buckets[client] = (tokens - cost, now)
+            self._buckets.move_to_end(client)
+            while len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+        return 0.0
+
+    def adjust(self, client: str, units: float) -> float:
+        """Give back (positive) or charge (negative) units; a bucket may go into debt. Returns the units left"""
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated_at = self._buckets.get(client, (self.capacity, now))
+            tokens = min(self.capacity, tokens + (now - updated_at) * self.rate + units)
+            self._buckets[client] = (tokens, now)
+        return tokens
+
+    def stats(self) -> Dict[str, object]:
+        return {"backend": "memory", "clients": len(self._buckets), "capacity": self.capacity, "refill_per_second": self.rate}
+
+
+class SQLiteBuckets:
+    """Token buckets in a SQLite table shared by every worker process
+
+    Each take is one short IMMEDIATE transaction. On SQLite errors requests are let
+    through: the limiter protects Ollama, it should not take the API down with it.
+    """
+
+    def __init__(self, capacity: float = RATE_LIMIT_CAPACITY, rate: float = RATE_LIMIT_REFILL_PER_SECOND,
+                 path: str = CACHE_PATH):
+        self.capacity = capacity
+        self.rate = rate
+        self.path = path
+        self._local = threading.local()
+        self._writes = 0
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None or getattr(self._local, "pid", None) != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS rate_limits (client TEXT PRIMARY KEY, tokens REAL NOT NULL, updated_at REAL NOT NULL)"
+            )
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return connection
+
+    def _update(self, client: str, cost: float, allow_debt: bool) -> Tuple[bool, float]:
+        """(taken, units left) after taking cost units, or (False, units available) when short"""
+        now = time.time()
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            row = connection.execute("SELECT tokens, updated_at FROM rate_limits WHERE client = ?", (client,)).fetchone()
+            tokens = self.capacity if row is None else min(self.capacity, row[0] + (now - row[1]) * self.rate)
+            if tokens < cost and not allow_debt:
+                connection.execute("COMMIT")
+                return False, tokens
+            tokens = min(self.capacity, tokens - cost)
+            connection.execute(
+                "INSERT OR REPLACE INTO rate_limits (client, tokens, updated_at) VALUES (?, ?, ?)",
+                (client, tokens, now)
+            )
+            connection.execute("COMMIT")
+        except sqlite3.Error:
+            connection.execute("ROLLBACK")
+            raise
+        self._writes += 1
+        if self._writes % 1000 == 0:
+            self.prune()
+        return True, tokens
+
+    def take(self, client: str, cost: float) -> float:
+        try:
+            taken, tokens = self._update(client, cost, allow_debt=False)
+        except sqlite3.Error as e:
+            print(f"Error updating rate limit bucket: {e}")
+            return 0.0
+        return 0.0 if taken else (cost - tokens) / self.rate
+
+    def adjust(self, client: str, units: float) -> float:
+        try:
+            return self._update(client, -units, allow_debt=True)[1]
+        except sqlite3.Error as e:
+            print(f"Error updating rate limit bucket: {e}")
+            return self.capacity
+
+    def prune(self):
+        """Drop buckets that have refilled to capacity; a bucket in debt is kept until it has"""
+        self._connection().execute(
+            "DELETE FROM rate_limits WHERE tokens + (? - updated_at) * ? >= ?", (time.time(), self.rate, self.capacity)
+        )
+
+    def stats(self) -> Dict[str, object]:
+        try:
+            clients = self._connection().execute("SELECT COUNT(*) FROM rate_limits").fetchone()[0]
+        except sqlite3.Error:
+            clients = None
+        return {"backend": "sqlite", "path": self.path, "clients": clients, "capacity": self.capacity, "refill_per_second": self.rate}
+
+
+def create_buckets():
+    """Build the buckets on the configured backend (RATE_LIMIT_BACKEND=memory|sqlite)"""
+    if RATE_LIMIT_BACKEND == "sqlite":
+        return SQLiteBuckets()
+    return MemoryBuckets()
+
+
+def client_key(request) -> str:
+    api_key = request.headers.get("x-api-key")
+    if api_key and api_key in RATE_LIMIT_API_KEYS:
+        return f"key:{api_key}"
+    forwarded = request.headers.get("x-forwarded-for") if RATE_LIMIT_TRUST_FORWARDED else None
+    if forwarded:
+        return f"ip:{forwarded.split(',')[0].strip()}"
+    return f"ip:{request.client.host if request.client else 'unknown'}"
+
+
+def settle(actual_cost: float) -> Optional[float]:
+    """Replace the current request's charge with its actual cost so far
+
+    May be called repeatedly as work completes. Returns the seconds until the client's
+    bucket is out of debt (0 when it is not in debt), or None outside a limited request.
+    """
+    charge = _current_charge.get()
+    if charge is None:
+        return None
+    buckets = charge["buckets"]
+    with charge["lock"]:
+        difference = actual_cost - charge["units"]
+        charge["units"] = actual_cost
+        tokens = buckets.adjust(charge["client"], -difference)
+    RATE_LIMIT_COST.inc(difference, endpoint=charge["endpoint"])
+    return max(0.0, -tokens) / buckets.rate
+
+
+def limit_app(app, costs: Dict[str, Callable[[object], float]], buckets=None):
+    """Rate limit the POST endpoints in `costs` (path -> estimated cost of a request)
+
+    Requests over the limit get a 429 with a Retry-After header; other paths are
+    never limited.
+    """
+    if not RATE_LIMIT_ENABLED:
+        return None
+    buckets = buckets or create_buckets()
+
+    @app.middleware("http")
+    async def rate_limit(request, call_next):
+        estimate = costs.get(request.url.path) if request.method == "POST" else None
+        if estimate is None:
+            return await call_next(request)
+
+        # A request costing more than a full bucket needs a full bucket
+        cost = min(float(estimate(request)), buckets.capacity)
+        client = client_key(request)
+        wait = buckets.take(client, cost)
+        if wait:
+            RATE_LIMIT_REJECTIONS.inc(endpoint=request.url.path)
+            retry_after = max(1, math.ceil(wait))
+            return JSONResponse(
+                status_code=429,
+                content={"detail": "Rate limit exceeded", "retry_after": retry_after},
+                headers={"Retry-After": str(retry_after)}
+            )
+        RATE_LIMIT_COST.inc(cost, endpoint=request.url.path)
+        token = _current_charge.set({
+            "buckets": buckets, "client": client, "units": cost, "endpoint": request.url.path, "lock": threading.Lock()
+        })
+        try:
+            return await call_next(request)
+        finally:
+            _current_charge.reset(token)
+
+    return buckets
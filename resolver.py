@@ -0,0 +1,109 @@
+"""Tiered resolution of simplifications and translations
+
+Each item is answered by the cheapest tier that knows it:
+
+0. reused: the same question in an earlier analysis (incremental re-analysis)
+1. structured: precomputed simplified questions and translations (the v2 forms data,
+   the LEQ dataset and their translation tables), looked up by normalized text
+   - pack: translations generated offline per language (translation_packs.py)
+2. cache: an earlier LLM answer for the same prompt (see cache.py)
+3. llm: a fresh Ollama call
+
+Callers record which tier answered so responses and metrics show how much traffic
+never reaches the model.
+"""
+import hashlib
+import re
+from typing import Any, Dict, Iterable, List, Optional
+
+from metrics import REGISTRY
+
+TIER_REUSED = "reused"
+TIER_STRUCTURED = "structured"
+TIER_PACK = "pack"
+TIER_CACHE = "cache"
+TIER_LLM = "llm"
+# The LLM tier was tried and failed; the item carries the fallback message
+TIER_FAILED = "failed"
+
+RESOLUTIONS = REGISTRY.counter(
+    "resolver_resolutions_total",
+    "Resolved items by kind (simplify/translate) and the tier that answered"
+)
+
+
+def normalize_text(text: str) -> str:
+    """Case, whitespace and trailing punctuation insensitive lookup key"""
+    return re.sub(r"\s+", " ", text).strip().rstrip(".?!:; ").lower()
+
+
+def question_fingerprint(text: str, language: str) -> str:
+    """Identifies a question and target language across edits of the same document"""
+    return hashlib.sha256(f"{language}:{normalize_text(text)}".encode()).hexdigest()[:16]
+
+
+def record_resolution(kind: str, tier: str):
+    RESOLUTIONS.inc(kind=kind, tier=tier)
+
+
+class StructuredIndex:
+    """Precomputed answers keyed by normalized English text"""
+
+    def __init__(self):
+        self._simplified: Dict[str, str] = {}
+        self._translations: Dict[str, Dict[str, str]] = {}
+        # Every English text seen, original or simplified, by normalized form
+        self._sources: Dict[str, str] = {}
+
+    def add(self, original: str, simplified: str, translations: Optional[Dict[str, str]] = None):
+        """Register a question, its simplified form and translations of the simplified form"""
+        self._simplified.setdefault(normalize_text(original), simplified)
+        for text in (original, simplified):
+            self._sources.setdefault(normalize_text(text), text)
+        # Translations are of the simplified text, so that is what they are looked up by
+        languages = self._translations.setdefault(normalize_text(simplified), {})
+        for language, text in (translations or {}).items():
+            languages.setdefault(language, text)
+
+    def simplified(self, question: str) -> Optional[str]:
+        return self._simplified.get(normalize_text(question))
+
+    def translation(self, text: str, language: str) -> Optional[str]:
+        return self._translations.get(normalize_text(text), {}).get(language)
+
+    def source_texts(self) -> List[str]:
+        """Every known English question and simplification, once each"""
+        return list(self._sources.values())
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "questions": len(self._simplified),
+            "translations": sum(len(languages) for languages in self._translations.values())
+        }
+
+
+def _translations_for(key: str, translation_tables: Dict[str, Dict[str, str]]) -> Dict[str, str]:
+    return {language: table[key] for language, table in translation_tables.items() if key in table}
+
+
+def build_structured_index(
+    forms_data: Dict[str, Any],
+    form_translations: Dict[str, Dict[str, str]],
+    leq_dataset: Dict[str, Iterable[Dict[str, str]]],
+    leq_translations: Dict[str, Dict[str, str]]
+) -> StructuredIndex:
+    """Index the v2 per-form questions (translations keyed by question id) and the
+    LEQ dataset (translations keyed by translation_key)"""
+    index = StructuredIndex()
+    for form in forms_data.values():
+        for section in form["sections"]:
+            for question in section["questions"]:
+                index.add(
+                    question["originalQuestion"],
+                    question["simplifiedQuestion"],
+                    _translations_for(question["id"], form_translations)
+                )
+    for leqs in leq_dataset.values():
+        for leq in leqs:
+            index.add(leq["original"], leq["simplified"], _translations_for(leq["translation_key"], leq_translations))
+    return index
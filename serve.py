@@ -0,0 +1,79 @@
+"""Production launcher: several worker processes sharing preloaded data and caches
+
+    python serve.py                         # api:app, one worker per CPU
+    python serve.py api_v2:app --workers 4 --port 8001
+
+With gunicorn installed the app module is imported once in the master process
+(preload) and the workers are forked from it, so the read-only datasets (forms,
+LEQ dataset, translations) live in shared copy-on-write pages instead of being
+rebuilt per worker. gc.freeze() moves them out of the collector's reach so garbage
+collection in the workers does not touch, and thereby copy, those pages.
+
+Caches default to the SQLite backend here so every worker reuses the LLM and
+upload results produced by the others. Without gunicorn the launcher falls back to
+uvicorn's own multi-process mode, which shares the caches but not the preloaded data.
+"""
+import argparse
+import gc
+import importlib
+import multiprocessing
+import os
+
+import uvicorn
+
+
+def default_workers() -> int:
+    return int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+
+
+def run_gunicorn(app_path: str, host: str, port: int, workers: int, timeout: int):
+    from gunicorn.app.base import BaseApplication
+
+    class PreloadedApplication(BaseApplication):
+        def load_config(self):
+            self.cfg.set("bind", f"{host}:{port}")
+            self.cfg.set("workers", workers)
+            self.cfg.set("worker_class", "uvicorn.workers.UvicornWorker")
+            self.cfg.set("preload_app", True)
+            self.cfg.set("timeout", timeout)
+            self.cfg.set("graceful_timeout", 30)
+
+        def load(self):
+            module_name, _, attribute = app_path.partition(":")
+            module = importlib.import_module(module_name)
+            app = getattr(module, attribute or "app")
+            # Imports and datasets are deferred at import time; pull them in before forking
+            if hasattr(module, "preload"):
+                module.preload()
+            # Everything built so far is now shared with the forked workers
+            gc.freeze()
+            return app
+
+    PreloadedApplication().run()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("app", nargs="?", default="api:app", help="module:attribute of the FastAPI app")
+    parser.add_argument("--host", default=os.getenv("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "8000")))
+    parser.add_argument("--workers", type=int, default=default_workers())
+    parser.add_argument("--timeout", type=int, default=300, help="seconds before a silent worker is restarted")
+    args = parser.parse_args()
+
+    if args.workers > 1:
+        os.environ.setdefault("CACHE_BACKEND", "sqlite")
+
+    if args.workers <= 1:
+        uvicorn.run(args.app, host=args.host, port=args.port)
+        return
+
+    try:
+        run_gunicorn(args.app, args.host, args.port, args.workers, args.timeout)
+    except ImportError:
+        print("gunicorn is not installed; starting uvicorn workers without preloaded shared data")
+        uvicorn.run(args.app, host=args.host, port=args.port, workers=args.workers)
+
+
+if __name__ == "__main__":
+    main()
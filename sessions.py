@@ -0,0 +1,132 @@
+"""Server-side chat sessions with a bounded, compacted history
+
+A session is a small JSON document in a result cache (see cache.py), so it inherits
+the cache's LRU and TTL eviction and, with CACHE_BACKEND=sqlite, is shared by every
+worker process:
+
+    {"summary": "...", "turns": [{"role": "user", "content": "..."}, ...],
+     "context": "...", "summarized_turns": 0, "created_at": ...}
+
+Each turn's prompt is the stable system prefix, the latest context the client
+sent (capped at SESSION_CONTEXT_MAX_TOKENS), the rolling summary, the last few
+turns and the new question. Once these exceed the token budget the oldest turns
+are folded into the summary, so prompt size stays roughly constant however long
+the conversation runs.
+"""
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from chunking import CHARS_PER_TOKEN, estimate_tokens
+
+SESSION_TTL = float(os.getenv("SESSION_TTL", str(2 * 3600)))
+SESSION_MAX_ENTRIES = int(os.getenv("SESSION_MAX_ENTRIES", "10000"))
+# History (summary + recent turns) allowed in a prompt before older turns are summarized
+SESSION_TOKEN_BUDGET = int(os.getenv("SESSION_TOKEN_BUDGET", "1500"))
+# Messages (user and assistant) always kept verbatim after a compaction
+SESSION_KEEP_MESSAGES = int(os.getenv("SESSION_KEEP_MESSAGES", "4"))
+# Client context is resent with every turn, so longer context is cut to this
+SESSION_CONTEXT_MAX_TOKENS = int(os.getenv("SESSION_CONTEXT_MAX_TOKENS", "500"))
+
+
+def new_session() -> Dict[str, Any]:
+    return {"summary": "", "turns": [], "context": "", "summarized_turns": 0, "created_at": time.time()}
+
+
+def cap_context(context: str, max_tokens: int = SESSION_CONTEXT_MAX_TOKENS) -> str:
+    """The context as kept in a session: its first `max_tokens`, marked when cut"""
+    if estimate_tokens(context) <= max_tokens:
+        return context
+    marker = " [...]"
+    return context[:max_tokens * CHARS_PER_TOKEN - len(marker)].rstrip() + marker
+
+
+def history_tokens(session: Dict[str, Any]) -> int:
+    return (estimate_tokens(session["context"]) + estimate_tokens(session["summary"])
+            + sum(estimate_tokens(turn["content"]) for turn in session["turns"]))
+
+
+def history_messages(session: Dict[str, Any]) -> List[Dict[str, str]]:
+    """Chat messages that carry the session into the next prompt
+
+    The context is its own message rather than part of a turn, so compaction never
+    folds it away. It counts against the history budget, but is capped well below it.
+    """
+    messages = []
+    if session["context"]:
+        messages.append({"role": "system", "content": f"Context:\n{session['context']}"})
+    if session["summary"]:
+        messages.append({"role": "system", "content": f"Summary of the conversation so far:\n{session['summary']}"})
+    return messages + session["turns"]
+
+
+def fold_older_turns(session: Dict[str, Any], summarize: Callable[[str, List[Dict[str, str]]], Optional[str]],
+                     keep_messages: int = SESSION_KEEP_MESSAGES) -> Dict[str, Any]:
+    """A copy of the session with all but the last `keep_messages` turns folded into the summary
+
+    When summarizing fails the older turns are dropped anyway; the budget matters more
+    than a perfect memory of the conversation.
+    """
+    split = len(session["turns"]) - keep_messages
+    if split <= 0:
+        return session
+    summary = summarize(session["summary"], session["turns"][:split])
+    return {
+        **session,
+        "summary": summary or session["summary"],
+        "turns": session["turns"][split:],
+        "summarized_turns": session["summarized_turns"] + split
+    }
+
+
+class SessionStore:
+    """Sessions in a cache; updates to one session are serialized, model calls are not
+
+    Locks are only held for a load-modify-save, never across an LLM call, so striping
+    them over a fixed set keeps memory bounded without making sessions wait on each other.
+    """
+
+    def __init__(self, cache, token_budget: int = SESSION_TOKEN_BUDGET):
+        self.cache = cache
+        self.token_budget = token_budget
+        self._locks = [threading.Lock() for _ in range(64)]
+
+    def _lock(self, session_id: str) -> threading.Lock:
+        return self._locks[hash(session_id) % len(self._locks)]
+
+    def load(self, session_id: str) -> Dict[str, Any]:
+        """The stored session, or a fresh one for unknown or expired ids"""
+        return self.cache.get(session_id) or new_session()
+
+    def add_turn(self, session_id: str, question: str, answer: str, context: str = None) -> Dict[str, Any]:
+        with self._lock(session_id):
+            session = self.load(session_id)
+            session["turns"] += [{"role": "user", "content": question}, {"role": "assistant", "content": answer}]
+            if context is not None:
+                session["context"] = cap_context(context)
+            self.cache.set(session_id, session)
+        return session
+
+    def needs_compaction(self, session: Dict[str, Any]) -> bool:
+        return history_tokens(session) > self.token_budget
+
+    def compact(self, session_id: str, summarize: Callable[[str, List[Dict[str, str]]], Optional[str]]):
+        """Summarize older turns outside the lock, then apply the result unless another compaction won"""
+        snapshot = self.load(session_id)
+        if not self.needs_compaction(snapshot):
+            return
+        folded = fold_older_turns(snapshot, summarize)
+        dropped = folded["summarized_turns"] - snapshot["summarized_turns"]
+        with self._lock(session_id):
+            session = self.load(session_id)
+            if not dropped or session["summarized_turns"] != snapshot["summarized_turns"]:
+                return
+            # Turns added while summarizing stay after the folded ones
+            session["summary"] = folded["summary"]
+            session["turns"] = session["turns"][dropped:]
+            session["summarized_turns"] += dropped
+            self.cache.set(session_id, session)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"token_budget": self.token_budget, **self.cache.stats()}
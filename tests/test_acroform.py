@@ -0,0 +1,31 @@
+"""Fillable PDFs through the AcroForm extraction path"""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+
+import acroform  # noqa: E402
+import api  # noqa: E402
+from sample_pdf import SAMPLE_FIELDS, sample_fillable_pdf, sample_form_pdf  # noqa: E402
+
+
+def test_fields_become_sectioned_questions():
+    form = acroform.extract_acroform(sample_fillable_pdf(1))
+
+    assert [section["sectionTitle"] for section in form["sections"]] == [
+        "Part 1. Information About You", "Part 2. Immigration History"
+    ]
+    chunks = acroform.sections_to_chunks(form["sections"])
+    assert len(chunks["long_essay_questions"]) == 2
+    assert len(chunks["short_answer_questions"]) == len(SAMPLE_FIELDS) - 2
+
+
+def test_flat_pdf_has_no_acroform():
+    assert acroform.extract_acroform(sample_form_pdf(1)) is None
+
+
+def test_fillable_pdf_is_identified_from_first_page():
+    result = api.process_pdf(sample_fillable_pdf(2))
+
+    assert result["extraction"] == "acroform"
+    assert result["form_type"] == "I-485"
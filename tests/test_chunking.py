@@ -0,0 +1,39 @@
+"""Translation chunks stay within budget and reassemble to the input"""
+from chunking import CHARS_PER_TOKEN, estimate_tokens, reassemble, split_for_translation
+
+DOCUMENTS = [
+    "",
+    "One short line.",
+    "\n\nLeading blank lines.\n\nTrailing ones.\n\n\n",
+    "Part 1.\n\nPart 2.\n  \nPart 3 with a  double space.",
+    ("A sentence that keeps going. " * 40 + "\n\n") * 3,
+    "word " * 500,
+    "prefix " + "x" * 5000 + " suffix",
+]
+
+
+def test_chunks_reassemble_exactly():
+    for text in DOCUMENTS:
+        for max_tokens in (5, 50, 400):
+            assert reassemble(split_for_translation(text, max_tokens)) == text
+
+
+def test_chunks_stay_within_budget():
+    for text in DOCUMENTS:
+        for max_tokens in (5, 50, 400):
+            for chunk, _ in split_for_translation(text, max_tokens):
+                assert estimate_tokens(chunk) <= max_tokens
+
+
+def test_short_paragraphs_share_a_chunk():
+    text = "\n\n".join(f"Paragraph {number}." for number in range(10))
+    chunks = split_for_translation(text, max_tokens=400)
+    assert chunks == [(text, "")]
+
+
+def test_oversized_word_is_sliced():
+    word = "y" * (30 * CHARS_PER_TOKEN + 3)
+    chunks = split_for_translation(f"see {word} here", max_tokens=10)
+    assert reassemble(chunks) == f"see {word} here"
+    assert len(chunks) >= 3
+    assert all(estimate_tokens(chunk) <= 10 for chunk, _ in chunks)
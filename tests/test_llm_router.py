@@ -0,0 +1,145 @@
+"""OllamaRouter against local fake HTTP backends"""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from llm_router import BackendRequestError, CircuitBreaker, NoHealthyBackendError, OllamaRouter
+
+
+class FakeBackend:
+    """Answers every POST with {"url": ...}, with a 500 while `failing`, or with `status` when set"""
+
+    def __init__(self):
+        backend = self
+        self.failing = False
+        self.status = None
+        self.hits = 0
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                self.rfile.read(int(self.headers.get("Content-Length") or 0))
+                backend.hits += 1
+                status = backend.status or (500 if backend.failing else 200)
+                body = json.dumps({"url": backend.url}).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def backends():
+    started = [FakeBackend(), FakeBackend()]
+    yield started
+    for backend in started:
+        backend.close()
+
+
+def test_least_outstanding_backend_is_chosen(backends):
+    router = OllamaRouter([backend.url for backend in backends], timeout=5)
+    router.backends[0].outstanding = 1
+
+    assert router.post("/api/generate", {})["url"] == backends[1].url
+    assert backends[1].hits == 1 and backends[0].hits == 0
+    assert router.backends[1].outstanding == 0
+
+
+def test_failure_is_retried_on_another_backend(backends):
+    router = OllamaRouter([backend.url for backend in backends], timeout=5)
+    backends[0].failing = True
+    # Backend 0 sorts first (equal load, no latency sample) and fails
+    router.backends[1].ewma_latency = 1.0
+
+    assert router.post("/api/generate", {})["url"] == backends[1].url
+    assert backends[0].hits == 1
+    assert router.backends[0].total_failures == 1
+
+
+def test_all_backends_failing_raises(backends):
+    router = OllamaRouter([backend.url for backend in backends], timeout=5)
+    for backend in backends:
+        backend.failing = True
+
+    with pytest.raises(NoHealthyBackendError):
+        router.post("/api/generate", {})
+
+
+def test_breaker_opens_then_half_opens_for_a_single_trial(backends):
+    backend = backends[0]
+    router = OllamaRouter([backend.url], timeout=5, failure_threshold=2, reset_timeout=0.2)
+    breaker = router.backends[0].breaker
+    backend.failing = True
+
+    for _ in range(2):
+        with pytest.raises(NoHealthyBackendError):
+            router.post("/api/generate", {})
+    assert breaker.state == CircuitBreaker.OPEN
+
+    # While open the backend is skipped without a request being sent
+    with pytest.raises(NoHealthyBackendError, match="No healthy"):
+        router.post("/api/generate", {})
+    assert backend.hits == 2
+
+    time.sleep(0.25)
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    trial = router._acquire([])
+    assert trial is router.backends[0]
+    # Only one trial call is let through while it is in flight
+    assert router._acquire([]) is None
+    router._release(trial, 0.01, ok=True)
+
+    assert breaker.state == CircuitBreaker.CLOSED
+    backend.failing = False
+    assert router.post("/api/generate", {})["url"] == backend.url
+
+
+def test_failed_trial_reopens_breaker(backends):
+    backend = backends[0]
+    router = OllamaRouter([backend.url], timeout=5, failure_threshold=2, reset_timeout=0.2)
+    breaker = router.backends[0].breaker
+    backend.failing = True
+
+    for _ in range(2):
+        with pytest.raises(NoHealthyBackendError):
+            router.post("/api/generate", {})
+    time.sleep(0.25)
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+
+    with pytest.raises(NoHealthyBackendError, match="All Ollama attempts failed"):
+        router.post("/api/generate", {})
+    assert backend.hits == 3
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.trial_in_flight
+
+
+def test_client_error_is_not_retried_or_counted(backends):
+    router = OllamaRouter([backend.url for backend in backends], timeout=5, failure_threshold=1)
+    for backend in backends:
+        backend.status = 404
+
+    for _ in range(3):
+        with pytest.raises(BackendRequestError) as error:
+            router.post("/api/generate", {"model": "not-pulled"})
+        assert error.value.status_code == 404
+    assert sum(backend.hits for backend in backends) == 3
+    assert all(backend.breaker.state == CircuitBreaker.CLOSED for backend in router.backends)
+    assert router.stats()["healthy_backends"] == 2
+
+    for backend in backends:
+        backend.status = None
+    assert "url" in router.post("/api/generate", {"model": "llama3.1"})
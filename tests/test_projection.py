@@ -0,0 +1,67 @@
+"""Cursor round trips and page normalization for the dataset endpoints"""
+import base64
+import json
+
+import pytest
+
+from projection import (DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, decode_cursor, encode_cursor, page_bounds, paginate,
+                        parse_list, project)
+
+
+def raw_cursor(payload) -> str:
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+
+def test_cursor_round_trips_without_padding():
+    for offset in (0, 1, 49, 50, 12345):
+        cursor = encode_cursor(offset)
+        assert "=" not in cursor
+        assert decode_cursor(cursor) == offset
+        # A client that kept the padding gets the same offset
+        assert decode_cursor(cursor + "=" * (-len(cursor) % 4)) == offset
+
+
+def test_bad_cursors_are_rejected():
+    for cursor in ("not a cursor", raw_cursor({"o": -1}), raw_cursor({"o": "5"}), raw_cursor({"o": True}),
+                   raw_cursor({"offset": 5}), raw_cursor([5])):
+        with pytest.raises(ValueError, match="Invalid cursor"):
+            decode_cursor(cursor)
+
+
+def test_page_bounds_normalizes_equivalent_requests():
+    assert page_bounds(None, None) == (0, None)
+    assert page_bounds("", None) == (0, None)
+    assert page_bounds(None, 20) == (0, 20)
+    # A cursor without a limit pages at the default size
+    assert page_bounds(encode_cursor(40), None) == (40, DEFAULT_PAGE_SIZE)
+    assert page_bounds(None, 0) == (0, DEFAULT_PAGE_SIZE)
+    assert page_bounds(None, -3) == (0, 1)
+    assert page_bounds(None, MAX_PAGE_SIZE * 10) == (0, MAX_PAGE_SIZE)
+    cursor = encode_cursor(7)
+    assert page_bounds(cursor, 5) == page_bounds(cursor + "=" * (-len(cursor) % 4), 5) == (7, 5)
+
+
+def test_paginate_walks_every_item_once():
+    items = list(range(23))
+    seen, cursor = [], None
+    while True:
+        offset, limit = page_bounds(cursor, 10)
+        page, cursor = paginate(items, offset, limit)
+        seen += page
+        if cursor is None:
+            break
+    assert seen == items
+    assert paginate(items, 0, None) == (items, None)
+    assert paginate(items, 30, 10) == ([], None)
+
+
+def test_parse_list_and_project():
+    assert parse_list(None, ("a", "b"), "fields") is None
+    assert parse_list(" ", ("a", "b"), "fields") is None
+    assert parse_list("b, a,b", ("a", "b"), "fields") == ("a", "b")
+    with pytest.raises(ValueError, match="Unknown fields: c"):
+        parse_list("a,c", ("a", "b"), "fields")
+
+    item = {"a": 1, "b": 2}
+    assert project(item, None) is item
+    assert project(item, ("b", "missing")) == {"b": 2}
@@ -0,0 +1,96 @@
+"""Token buckets, settling a request's charge, and the 429 the middleware sends"""
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from ratelimit import MemoryBuckets, SQLiteBuckets, limit_app, settle
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def buckets(request, tmp_path):
+    if request.param == "sqlite":
+        return SQLiteBuckets(capacity=10, rate=0.5, path=str(tmp_path / "rate_limits.db"))
+    return MemoryBuckets(capacity=10, rate=0.5)
+
+
+def test_take_until_empty_then_wait_for_refill(buckets):
+    assert buckets.take("a", 6) == 0
+    assert buckets.take("a", 4) == 0
+    # Empty: 2 units at 0.5/s take 4 seconds
+    assert buckets.take("a", 2) == pytest.approx(4, abs=0.05)
+    # A rejected take costs nothing, and other clients are unaffected
+    assert buckets.take("a", 2) == pytest.approx(4, abs=0.05)
+    assert buckets.take("b", 10) == 0
+
+
+def test_adjust_refunds_up_to_capacity_and_charges_into_debt(buckets):
+    buckets.take("a", 8)
+    assert buckets.adjust("a", 100) == pytest.approx(10, abs=0.05)
+    assert buckets.adjust("a", -15) == pytest.approx(-5, abs=0.05)
+    # Paying off 5 units of debt before 1 unit is available takes 12 seconds
+    assert buckets.take("a", 1) == pytest.approx(12, abs=0.05)
+
+
+def test_sqlite_prune_keeps_buckets_in_debt(tmp_path):
+    buckets = SQLiteBuckets(capacity=10, rate=0.5, path=str(tmp_path / "rate_limits.db"))
+    buckets.adjust("debtor", -20)
+    buckets.take("idle", 1)
+    connection = buckets._connection()
+    # Both last updated long enough ago for a full bucket to refill from zero, not from -10
+    connection.execute("UPDATE rate_limits SET updated_at = updated_at - 21")
+    buckets.prune()
+
+    clients = {row[0] for row in connection.execute("SELECT client FROM rate_limits")}
+    assert clients == {"debtor"}
+    assert buckets.take("debtor", 1) == pytest.approx(1, abs=0.05)
+
+
+def limited_app(buckets, cost=8):
+    app = FastAPI()
+
+    @app.post("/generate")
+    def generate(actual: float = None):
+        return {"retry_after": settle(actual) if actual is not None else None}
+
+    limit_app(app, {"/generate": lambda request: cost}, buckets=buckets)
+    return app
+
+
+def test_over_limit_gets_429_with_retry_after(buckets):
+    client = TestClient(limited_app(buckets))
+
+    assert client.post("/generate").status_code == 200
+    response = client.post("/generate")
+    assert response.status_code == 429
+    # 2 units left, 8 needed at 0.5/s
+    assert response.headers["Retry-After"] == "12"
+    assert response.json()["retry_after"] == 12
+    # Other methods and paths are never limited
+    assert client.get("/generate").status_code == 405
+
+
+def test_settle_refunds_or_charges_the_difference(buckets):
+    client = TestClient(limited_app(buckets))
+
+    # Estimated 8, actually 0: everything is refunded
+    assert client.post("/generate", params={"actual": 0}).json()["retry_after"] == 0
+    assert buckets.take("ip:testclient", 10) == 0
+    buckets.adjust("ip:testclient", 10)
+
+    # Estimated 8, actually 20: the bucket goes 10 into debt, 20 seconds to pay off
+    retry_after = client.post("/generate", params={"actual": 20}).json()["retry_after"]
+    assert retry_after == pytest.approx(20, abs=0.1)
+    assert client.post("/generate").status_code == 429
+
+
+def test_settle_outside_a_limited_request():
+    assert settle(5) is None
+
+
+def test_refill_is_continuous():
+    buckets = MemoryBuckets(capacity=2, rate=20)
+    buckets.take("a", 2)
+    time.sleep(0.06)
+    assert buckets.take("a", 1) == 0
@@ -0,0 +1,39 @@
+"""Session history stays bounded and keeps its context across compactions"""
+from cache import MemoryCache
+from sessions import SESSION_CONTEXT_MAX_TOKENS, SessionStore, history_messages, history_tokens
+
+
+def summarize(previous, turns):
+    return (previous + " " + " ".join(turn["content"][:10] for turn in turns)).strip()
+
+
+def test_context_survives_compaction():
+    store = SessionStore(MemoryCache("test-sessions"), token_budget=50)
+    store.add_turn("s", "first question " * 5, "first answer " * 5, context="Applicant: I-485, married to a citizen")
+    for turn in range(6):
+        store.add_turn("s", f"question {turn} " * 5, f"answer {turn} " * 5)
+        store.compact("s", summarize)
+
+    session = store.load("s")
+    assert session["summarized_turns"] > 0
+    assert history_tokens(session) <= 50 + 40
+    messages = history_messages(session)
+    assert messages[0] == {"role": "system", "content": "Context:\nApplicant: I-485, married to a citizen"}
+    assert not any("Applicant" in turn["content"] for turn in session["turns"])
+
+
+def test_context_is_replaced_not_appended():
+    store = SessionStore(MemoryCache("test-sessions"))
+    store.add_turn("s", "q1", "a1", context="old")
+    store.add_turn("s", "q2", "a2", context="new")
+    store.add_turn("s", "q3", "a3")
+
+    assert [message["content"] for message in history_messages(store.load("s")) if message["role"] == "system"] == ["Context:\nnew"]
+
+
+def test_long_context_is_capped_and_counted():
+    store = SessionStore(MemoryCache("test-sessions"))
+    session = store.add_turn("s", "q1", "a1", context="Applicant details. " * 1000)
+
+    assert session["context"].endswith("[...]")
+    assert SESSION_CONTEXT_MAX_TOKENS - 5 <= history_tokens(session) - 2 <= SESSION_CONTEXT_MAX_TOKENS
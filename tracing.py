@@ -0,0 +1,166 @@
+"""Per-request stage timing and request metrics for the FastAPI apps"""
+import asyncio
+import functools
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+
+from fastapi.routing import APIRoute
+from starlette.routing import Match
+
+from metrics import REGISTRY
+from profiler import SamplingProfiler, store_profile, token_matches
+
+REQUEST_SECONDS = REGISTRY.histogram(
+    "http_request_duration_seconds",
+    "Request latency by endpoint"
+)
+REQUESTS_TOTAL = REGISTRY.counter(
+    "http_requests_total",
+    "Requests by endpoint and status code"
+)
+REQUESTS_IN_PROGRESS = REGISTRY.gauge(
+    "http_requests_in_progress",
+    "Requests currently being handled"
+)
+STAGE_SECONDS = REGISTRY.histogram(
+    "pipeline_stage_duration_seconds",
+    "Time spent in each pipeline stage (extract, identify, chunk, simplify, translate, ...)"
+)
+
+
+class RequestTrace:
+    """Stage timings collected while one request is handled"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages: Dict[str, List[float]] = {}
+        self.profiler: Optional[SamplingProfiler] = None
+
+    def add(self, stage: str, seconds: float):
+        self.stages.setdefault(stage, []).append(seconds)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        return {
+            stage: {"ms": round(sum(values) * 1000, 2), "count": len(values)}
+            for stage, values in self.stages.items()
+        }
+
+    def server_timing(self) -> str:
+        """Render as a Server-Timing header (visible in browser devtools)"""
+        parts = []
+        for stage, values in self.stages.items():
+            entry = f"{stage};dur={sum(values) * 1000:.2f}"
+            if len(values) > 1:
+                entry += f';desc="x{len(values)}"'
+            parts.append(entry)
+        parts.append(f"total;dur={(time.perf_counter() - self.started) * 1000:.2f}")
+        return ", ".join(parts)
+
+
+_current_trace: ContextVar[Optional[RequestTrace]] = ContextVar("request_trace", default=None)
+
+
+def current_trace() -> Optional[RequestTrace]:
+    return _current_trace.get()
+
+
+@contextmanager
+def span(stage: str):
+    """Time a pipeline stage, recording it on the current request and in the stage histogram"""
+    trace = _current_trace.get()
+    # Streaming bodies and pool tasks run outside the endpoint; follow them there too
+    profile_current_thread(trace)
+
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        STAGE_SECONDS.observe(elapsed, stage=stage)
+        if trace is not None:
+            trace.add(stage, elapsed)
+
+
+def profile_current_thread(trace: Optional[RequestTrace]) -> bool:
+    """Let the request's profiler (if any) sample the calling thread; True when it was added"""
+    if trace is None or trace.profiler is None:
+        return False
+    thread_id = threading.get_ident()
+    if thread_id in trace.profiler.thread_ids:
+        return False
+    trace.profiler.thread_ids.add(thread_id)
+    return True
+
+
+class ProfiledRoute(APIRoute):
+    """Route whose sync endpoint registers its threadpool worker with the request's profiler"""
+
+    def __init__(self, path: str, endpoint, **kwargs):
+        if not asyncio.iscoroutinefunction(endpoint):
+            endpoint = _profiled_endpoint(endpoint)
+        super().__init__(path, endpoint, **kwargs)
+
+
+def _profiled_endpoint(endpoint):
+    @functools.wraps(endpoint)
+    def run(*args, **kwargs):
+        trace = _current_trace.get()
+        added = profile_current_thread(trace)
+        try:
+            return endpoint(*args, **kwargs)
+        finally:
+            # The worker goes back to the pool and may pick up another request
+            if added:
+                trace.profiler.thread_ids.discard(threading.get_ident())
+
+    return run
+
+
+def route_template(app, scope) -> str:
+    """Map a request to its route path (/forms/{form_code}) to keep label cardinality bounded"""
+    for route in app.router.routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return getattr(route, "path", "unmatched")
+    return "unmatched"
+
+
+def instrument_app(app, admin_token: str = ""):
+    """Add request latency metrics and a Server-Timing header with the stage breakdown
+
+    With an admin token configured, a request carrying `X-Profile: 1` and a matching
+    `X-Admin-Token` is sampled while it runs; the response gets an `X-Profile-Id`
+    whose collapsed stacks can be fetched from the admin profile endpoint. Routes
+    declared after this call use ProfiledRoute, so the threadpool worker running a
+    sync handler is sampled for the whole call, not only inside `span`.
+    """
+    app.router.route_class = ProfiledRoute
+
+    @app.middleware("http")
+    async def trace_requests(request, call_next):
+        trace = RequestTrace()
+        if request.headers.get("x-profile") and token_matches(admin_token, request.headers.get("x-admin-token")):
+            trace.profiler = SamplingProfiler(thread_ids=[threading.get_ident()]).start()
+        token = _current_trace.set(trace)
+        REQUESTS_IN_PROGRESS.inc()
+        status = 500
+        try:
+            response = await call_next(request)
+            status = response.status_code
+            response.headers["Server-Timing"] = trace.server_timing()
+            if trace.profiler is not None:
+                response.headers["X-Profile-Id"] = store_profile(trace.profiler.stop())
+            return response
+        finally:
+            if trace.profiler is not None:
+                trace.profiler.stop()
+            _current_trace.reset(token)
+            REQUESTS_IN_PROGRESS.dec()
+            endpoint = route_template(app, request.scope)
+            REQUEST_SECONDS.observe(time.perf_counter() - trace.started, method=request.method, endpoint=endpoint)
+            REQUESTS_TOTAL.inc(method=request.method, endpoint=endpoint, status=str(status))
+
+    return app
@@ -0,0 +1,157 @@
+"""Offline translation packs: every known question and simplification, per language
+
+    python translation_packs.py build                    # every language in api.LANGUAGE_NAMES
+    python translation_packs.py build --language hi ko   # only some
+    python translation_packs.py list
+
+The builder runs each English text the structured index knows (form questions, LEQs
+and their simplifications) through the translate model once per language and writes
+one gzipped JSON file per language, named <language>.v<PACK_FORMAT>.json.gz, into
+TRANSLATION_PACKS_DIR. Texts the hand-written translation tables already cover are
+skipped. Packs record the model, the build time and a hash of the source texts.
+
+The server loads a pack the first time its language is requested, so memory only
+grows with the languages actually in use. Files with another format version are ignored.
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import sys
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from resolver import normalize_text
+
+# Bump when the file layout changes; older files are then ignored rather than misread
+PACK_FORMAT = 1
+TRANSLATION_PACKS_DIR = os.getenv(
+    "TRANSLATION_PACKS_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "translation_packs")
+)
+
+
+def pack_path(directory: str, language: str) -> str:
+    return os.path.join(directory, f"{language}.v{PACK_FORMAT}.json.gz")
+
+
+def source_hash(texts: List[str]) -> str:
+    return hashlib.sha256("\n".join(sorted(normalize_text(text) for text in texts)).encode()).hexdigest()[:16]
+
+
+class TranslationPacks:
+    """Per-language packs loaded on first use"""
+
+    def __init__(self, directory: str = TRANSLATION_PACKS_DIR):
+        self.directory = directory
+        self._packs: Dict[str, Optional[Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+
+    def _load(self, language: str) -> Optional[Dict[str, Any]]:
+        path = pack_path(self.directory, language)
+        if not os.path.exists(path):
+            return None
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                pack = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Error loading translation pack {path}: {e}")
+            return None
+        if pack.get("format") != PACK_FORMAT:
+            return None
+        return pack
+
+    def pack(self, language: str) -> Optional[Dict[str, Any]]:
+        pack = self._packs.get(language, False)
+        if pack is False:
+            with self._lock:
+                if language not in self._packs:
+                    # A missing pack is remembered too, so absent languages cost one stat()
+                    self._packs[language] = self._load(language)
+                pack = self._packs[language]
+        return pack
+
+    def translation(self, text: str, language: str) -> Optional[str]:
+        pack = self.pack(language)
+        if pack is None:
+            return None
+        return pack["entries"].get(normalize_text(text))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "directory": self.directory,
+            "loaded": {
+                language: {"entries": len(pack["entries"]), "built_at": pack["built_at"], "model": pack["model"]}
+                for language, pack in self._packs.items() if pack is not None
+            }
+        }
+
+
+def build_pack(language: str, directory: str = TRANSLATION_PACKS_DIR) -> Dict[str, Any]:
+    """Translate every known text missing from the hand-written tables and write the pack"""
+    import api
+
+    index = api.get_structured_index()
+    texts = index.source_texts()
+    pending = [text for text in texts if index.translation(text, language) is None]
+
+    futures = {text: api.llm_pool.submit(api.translate_with_ollama, text, language) for text in pending}
+    entries = {}
+    failed = 0
+    for text, future in futures.items():
+        translated, tier = future.result()
+        if tier == api.TIER_FAILED or not translated:
+            failed += 1
+            continue
+        entries[normalize_text(text)] = translated
+
+    pack = {
+        "format": PACK_FORMAT,
+        "language": language,
+        "model": api.profile_settings("translate")[0],
+        "built_at": datetime.now().isoformat(timespec="seconds"),
+        "source_hash": source_hash(texts),
+        "entries": entries
+    }
+    os.makedirs(directory, exist_ok=True)
+    path = pack_path(directory, language)
+    with gzip.open(path + ".tmp", "wt", encoding="utf-8") as f:
+        json.dump(pack, f, ensure_ascii=False, separators=(",", ":"), sort_keys=True)
+    os.replace(path + ".tmp", path)
+    return {"language": language, "path": path, "entries": len(entries), "skipped": len(texts) - len(pending), "failed": failed}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--directory", default=TRANSLATION_PACKS_DIR)
+    commands = parser.add_subparsers(dest="command", required=True)
+    build_parser = commands.add_parser("build", help="generate packs with the translate model")
+    build_parser.add_argument("--language", nargs="+", help="language codes (default: all supported)")
+    commands.add_parser("list", help="show the packs on disk")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        import api
+
+        for language in args.language or list(api.LANGUAGE_NAMES):
+            result = build_pack(language, args.directory)
+            print(f"{language}: {result['entries']} entries, {result['skipped']} already in the tables, "
+                  f"{result['failed']} failed -> {result['path']}")
+            if result["failed"]:
+                print(f"  rerun to retry the failed texts for {language}", file=sys.stderr)
+        return
+
+    packs = TranslationPacks(args.directory)
+    for filename in sorted(os.listdir(args.directory)) if os.path.isdir(args.directory) else []:
+        language = filename.split(".", 1)[0]
+        pack = packs.pack(language) if filename == os.path.basename(pack_path(args.directory, language)) else None
+        if pack is not None:
+            print(f"{language}: {len(pack['entries'])} entries, model {pack['model']}, built {pack['built_at']}, "
+                  f"sources {pack['source_hash']}")
+        else:
+            print(f"{filename}: not a current pack (format v{PACK_FORMAT})")
+
+
+if __name__ == "__main__":
+    main()